@@ -0,0 +1,2 @@
+from .http_client import HttpClient
+from .resilience import UpstreamGuard, UpstreamUnavailableError
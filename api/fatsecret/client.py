@@ -1,3 +1,5 @@
+import asyncio
+import logging
 from typing import Optional
         
 import aiohttp
@@ -6,6 +8,11 @@ from datetime import datetime, timezone, timedelta
 from .models import TokenData, FoodSearchResponse, Food
 from .constants import FATSECRET_TOKEN_URL, FATSECRET_API_URL
 from .save_system import SaveSystem
+from ..http_client import HttpClient
+from ..resilience import UpstreamGuard, UpstreamUnavailableError
+from observability.metrics import observe_api_call
+
+logger = logging.getLogger(__name__)
 
 
 class FatSecretClient:
@@ -14,52 +21,90 @@ class FatSecretClient:
         self,
         client_id: str,
         client_secret: str,
-        save_path: Optional[str] = None
+        http_client: HttpClient,
+        save_path: Optional[str] = None,
+        guard: Optional[UpstreamGuard] = None,
+        refresh_margin: float = 300.0
     ) -> None:
         self.save_id = f"{self.__class__.__name__}"
         self.save_system = SaveSystem(save_path) if save_path else None
         self.client_id = client_id
         self.client_secret = client_secret
+        self.http_client = http_client
+        self.guard = guard or UpstreamGuard("fatsecret")
+        self.refresh_margin = timedelta(seconds=refresh_margin)
         self.access_token = None
+        self._refresh_task: Optional[asyncio.Task] = None
         self._load_token_data()
 
     async def get_food_data(
         self,
         food_name: str,
         max_results: int = 1
-    ) -> list[Food]:
-        if not self._validate_token():
-            success = await self._update_access_token()
-            if not success:
-                return []
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "Authorization": f"Bearer {self.access_token.access_token}"
-            }
-            params = {
-                "search_expression": food_name,
-                "max_results": max_results,
-                "format": "json"
-            }
-            try:
-                async with session.get(
+    ) -> list[Food] | None:
+        if not await self._ensure_token():
+            return None
+        headers = {
+            "Authorization": f"Bearer {self.access_token.access_token}"
+        }
+        params = {
+            "search_expression": food_name,
+            "max_results": max_results,
+            "format": "json"
+        }
+        try:
+            with observe_api_call("fatsecret", "foods.search"):
+                result = await self.guard.call(lambda: self._get_json(
                     FATSECRET_API_URL + "/foods/search/v1",
                     headers=headers,
                     params=params
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        food_response = FoodSearchResponse.model_validate(result)
-                        if isinstance(food_response.foods.food, list):
-                            return food_response.foods.food
-                        else:
-                            return [food_response.foods.food]
-                    else:
-                        print(f"Failed to get food data: {response.status}")
-                        return []
-            except Exception as e:
-                print(f"Error requesting food data: {str(e)}")
+                ))
+            food_response = FoodSearchResponse.model_validate(result)
+            if food_response.foods.food is None:
                 return []
+            if isinstance(food_response.foods.food, list):
+                return food_response.foods.food
+            else:
+                return [food_response.foods.food]
+        except UpstreamUnavailableError as e:
+            logger.warning("Skipping food data request: %s", e)
+            return None
+        except aiohttp.ClientResponseError as e:
+            if e.status == 401:
+                # The token was revoked or expired early; the next call
+                # requests a new one.
+                self.access_token = None
+            logger.error("Error requesting food data: %s", e)
+            return None
+        except Exception as e:
+            logger.error("Error requesting food data: %s", e)
+            return None
+
+    async def close(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        if self.save_system:
+            await self.save_system.flush()
+
+    async def _ensure_token(self) -> bool:
+        if self._validate_token():
+            if self._expires_soon():
+                # Renewed in the background while the current token is still
+                # good, so requests do not wait for it.
+                self._start_refresh()
+            return True
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task:
+        # Concurrent callers share one token request instead of each
+        # firing their own.
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._update_access_token())
+            self._refresh_task.add_done_callback(self._refresh_done)
+        return self._refresh_task
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_task = None
 
     async def _update_access_token(self) -> bool:
         token_data = await self._request_access_token()
@@ -72,31 +117,48 @@ class FatSecretClient:
     def _validate_token(self) -> bool:
         if not self.access_token:
             return False
-        expiration_time = self.access_token.created_at + timedelta(seconds=self.access_token.expires_in)
-        return datetime.now(timezone.utc) < expiration_time
+        return datetime.now(timezone.utc) < self._expiration_time()
+
+    def _expires_soon(self) -> bool:
+        # Short-lived tokens are renewed in their second half at the latest.
+        margin = min(self.refresh_margin, timedelta(seconds=self.access_token.expires_in) / 2)
+        return datetime.now(timezone.utc) >= self._expiration_time() - margin
+
+    def _expiration_time(self) -> datetime:
+        return self.access_token.created_at + timedelta(seconds=self.access_token.expires_in)
 
     async def _request_access_token(self) -> Optional[TokenData]:
-        async with aiohttp.ClientSession() as session:
-            data = {
-                "grant_type": "client_credentials",
-                "scope": "basic"
-            }
-            try:
-                async with session.post(
+        data = {
+            "grant_type": "client_credentials",
+            "scope": "basic"
+        }
+        try:
+            # A client-credentials grant has no side effects, so the token
+            # request is retried like the GET calls.
+            with observe_api_call("fatsecret", "token"):
+                result = await self.guard.call(lambda: self._post_json(
                     FATSECRET_TOKEN_URL,
                     data=data,
                     auth=aiohttp.BasicAuth(self.client_id, self.client_secret)
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return TokenData.model_validate(result)
-                    else:
-                        print(f"Failed to get access token: {response.status}")
-                        return None
-            except Exception as e:
-                print(f"Error requesting access token: {str(e)}")
-                return None
-            
+                ))
+            return TokenData.model_validate(result)
+        except UpstreamUnavailableError as e:
+            logger.warning("Skipping access token request: %s", e)
+            return None
+        except Exception as e:
+            logger.error("Error requesting access token: %s", e)
+            return None
+
+    async def _get_json(self, url: str, **kwargs) -> dict:
+        async with self.http_client.session.get(url, timeout=self.guard.timeout, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def _post_json(self, url: str, **kwargs) -> dict:
+        async with self.http_client.session.post(url, timeout=self.guard.timeout, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json()
+        
     def _load_token_data(self) -> None:
         if not self.save_system:
             return
@@ -105,7 +167,7 @@ class FatSecretClient:
             try:
                 self.access_token = TokenData.model_validate(data)
             except Exception as e:
-                print(f"Error loading token data: {str(e)}")
+                logger.error("Error loading token data: %s", e)
 
     def _save_token_data(self) -> None:
         if not self.save_system or not self.access_token:
@@ -1,2 +1,4 @@
-FATSECRET_TOKEN_URL = "https://oauth.fatsecret.com/connect/token"
-FATSECRET_API_URL = "https://platform.fatsecret.com/rest"
\ No newline at end of file
+import os
+
+FATSECRET_TOKEN_URL = os.getenv("FATSECRET_TOKEN_URL", "https://oauth.fatsecret.com/connect/token")
+FATSECRET_API_URL = os.getenv("FATSECRET_API_URL", "https://platform.fatsecret.com/rest")
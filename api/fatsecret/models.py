@@ -19,7 +19,7 @@ class Food(BaseModel):
 
 
 class FoodData(BaseModel):
-    food: Union[Food, List[Food]]
+    food: Union[Food, List[Food], None] = None
     max_results: str
     page_number: str
     total_results: str
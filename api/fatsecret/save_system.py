@@ -1,12 +1,21 @@
+import asyncio
 import json
+import logging
+import os
+import tempfile
 from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
 
 
 class SaveSystem:
-    
+
     def __init__(self, file_path: str):
         self.file_path = Path(file_path)
         self._data = self._load_data()
+        self._dirty = False
+        self._write_task: Optional[asyncio.Task] = None
 
     def _load_data(self):
         if self.file_path.exists():
@@ -17,13 +26,46 @@ class SaveSystem:
                 raise FileNotFoundError("Save file is corrupted")
         return {}
 
-    def _save_data(self):
-        with self.file_path.open("w", encoding="utf-8") as f:
-            json.dump(self._data, f, indent=4)
+    def _save_data(self, payload: str) -> None:
+        # The new content is written next to the file and renamed over it, so
+        # a crash mid-write never leaves a truncated save behind.
+        fd, tmp_path = tempfile.mkstemp(dir=self.file_path.parent, prefix=f".{self.file_path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
 
     def load(self, id: str, default=None) -> dict[str, any]:
         return self._data.get(id, default)
 
     def save(self, id: str, value: dict[str, any]) -> None:
         self._data[id] = value
-        self._save_data()
\ No newline at end of file
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._dirty = False
+            self._save_data(json.dumps(self._data, indent=4))
+            return
+        # Saves made while a write is in flight are folded into one more
+        # write of the latest data.
+        if self._write_task is None or self._write_task.done():
+            self._write_task = loop.create_task(self._write_pending())
+
+    async def flush(self) -> None:
+        if self._write_task is not None:
+            await self._write_task
+
+    async def _write_pending(self) -> None:
+        while self._dirty:
+            self._dirty = False
+            payload = json.dumps(self._data, indent=4)
+            try:
+                await asyncio.to_thread(self._save_data, payload)
+            except OSError as e:
+                logger.error("Error writing save file: %s", e)
@@ -1,12 +1,24 @@
-import aiohttp
+import logging
+from typing import Optional
 
 from .constants import OFF_API_URL
+from ..http_client import HttpClient
+from ..resilience import UpstreamGuard, UpstreamUnavailableError
+from observability.metrics import observe_api_call
+
+logger = logging.getLogger(__name__)
 
 
 class OFFClient:
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        http_client: HttpClient,
+        guard: Optional[UpstreamGuard] = None
+    ) -> None:
         self.base_url = OFF_API_URL
+        self.http_client = http_client
+        self.guard = guard or UpstreamGuard("off")
         self.base_header = {
             "User-Agent": "MyApp/1.0 (daorlov@edu.hse.ru)"
         }
@@ -23,16 +35,27 @@ class OFFClient:
                 "json": 1,
                 "fields": "product_name,nutriments"
             }
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint, params=params, headers=self.base_header) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    products = data.get("products", [])
-                    if products:
-                        first_product = products[0]
-                        nutriments = first_product.get("nutriments", {})
-                        return nutriments.get("energy-kcal_100g")
+            with observe_api_call("off", "search"):
+                data = await self.guard.call(lambda: self._get_json(endpoint, params))
+            products = data.get("products", [])
+            if products:
+                first_product = products[0]
+                nutriments = first_product.get("nutriments", {})
+                return nutriments.get("energy-kcal_100g")
+            return None
+        except UpstreamUnavailableError as e:
+            logger.warning("Skipping product request: %s", e)
             return None
         except Exception as e:
-            print(f"Error fetching product data: {e}")
-            return None
\ No newline at end of file
+            logger.error("Error fetching product data: %s", e)
+            return None
+
+    async def _get_json(self, endpoint: str, params: dict) -> dict:
+        async with self.http_client.session.get(
+            endpoint,
+            params=params,
+            headers=self.base_header,
+            timeout=self.guard.timeout
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
\ No newline at end of file
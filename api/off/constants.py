@@ -1 +1,3 @@
-OFF_API_URL = "https://world.openfoodfacts.org"
\ No newline at end of file
+import os
+
+OFF_API_URL = os.getenv("OFF_API_URL", "https://world.openfoodfacts.org")
@@ -1,2 +1,3 @@
 from .client import OWMClient
+from .cache import WeatherCache
 from .models import WeatherData
\ No newline at end of file
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from typing import Literal
+
+from .client import OWMClient
+from .models import WeatherData
+
+
+class WeatherCache:
+
+    def __init__(
+        self,
+        client: OWMClient,
+        ttl: float = 3600.0,
+        max_size: int = 1024
+    ) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self._entries: dict[tuple[str, str], tuple[float, WeatherData]] = {}
+        self._pending: dict[tuple[str, str], asyncio.Task] = {}
+
+    @staticmethod
+    def normalize_city(city: str) -> str:
+        return " ".join(city.split()).casefold()
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def get_weather(
+        self,
+        city: str,
+        units: Literal["standard", "metric", "imperial"] = "metric"
+    ) -> WeatherData | None:
+        key = (self.normalize_city(city), units)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        task = self._pending.get(key)
+        if task is not None:
+            self.hits += 1
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._fetch(key, city, units))
+            self._pending[key] = task
+        return await asyncio.shield(task)
+
+    def invalidate(self, city: str) -> None:
+        normalized = self.normalize_city(city)
+        for key in [key for key in self._entries if key[0] == normalized]:
+            del self._entries[key]
+
+    async def _fetch(
+        self,
+        key: tuple[str, str],
+        city: str,
+        units: Literal["standard", "metric", "imperial"]
+    ) -> WeatherData | None:
+        try:
+            weather = await self.client.get_weather(city, units)
+            if weather is not None:
+                self._store(key, weather)
+                return weather
+            # While OWM is unavailable an expired entry is still served.
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.stale_served += 1
+                return entry[1]
+            return None
+        finally:
+            self._pending.pop(key, None)
+
+    def _store(self, key: tuple[str, str], weather: WeatherData) -> None:
+        now = time.monotonic()
+        if len(self._entries) >= self.max_size:
+            self._entries = {
+                cached_key: cached
+                for cached_key, cached in self._entries.items()
+                if cached[0] > now
+            }
+            if len(self._entries) >= self.max_size:
+                oldest_key = min(self._entries, key=lambda cached_key: self._entries[cached_key][0])
+                del self._entries[oldest_key]
+        self._entries[key] = (now + self.ttl, weather)
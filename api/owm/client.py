@@ -1,15 +1,27 @@
-from typing import Literal
-import aiohttp
+import logging
+from typing import Literal, Optional
 
 from .constants import OWM_API_URL
 from .models import WeatherData
+from ..http_client import HttpClient
+from ..resilience import UpstreamGuard, UpstreamUnavailableError
+from observability.metrics import observe_api_call
+
+logger = logging.getLogger(__name__)
 
 
 class OWMClient:
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        http_client: HttpClient,
+        guard: Optional[UpstreamGuard] = None
+    ) -> None:
         self.base_url = OWM_API_URL
         self.api_key = api_key
+        self.http_client = http_client
+        self.guard = guard or UpstreamGuard("owm")
 
     async def get_weather(
         self,
@@ -23,10 +35,21 @@ class OWMClient:
                 "appid": self.api_key,
                 "units": units
             }
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint, params=params) as response:
-                    response.raise_for_status()
-                    return WeatherData.model_validate(await response.json())
+            with observe_api_call("owm", "weather"):
+                data = await self.guard.call(lambda: self._get_json(endpoint, params))
+            return WeatherData.model_validate(data)
+        except UpstreamUnavailableError as e:
+            logger.warning("Skipping weather request: %s", e)
+            return None
         except Exception as e:
-            print(f"Error fetching weather data: {e}")
-            return None
\ No newline at end of file
+            logger.error("Error fetching weather data: %s", e)
+            return None
+
+    async def _get_json(self, endpoint: str, params: dict) -> dict:
+        async with self.http_client.session.get(
+            endpoint,
+            params=params,
+            timeout=self.guard.timeout
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
\ No newline at end of file
@@ -1 +1,3 @@
-OWM_API_URL = "https://api.openweathermap.org/data/2.5"
\ No newline at end of file
+import os
+
+OWM_API_URL = os.getenv("OWM_API_URL", "https://api.openweathermap.org/data/2.5")
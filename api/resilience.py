@@ -0,0 +1,166 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamUnavailableError(Exception):
+    pass
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    pass
+
+
+class BulkheadFullError(UpstreamUnavailableError):
+    pass
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold: int = 5, recovery_time: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.recovery_time:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> bool:
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError("Circuit is open")
+        if state == "half_open":
+            # After the recovery time a single trial call is let through;
+            # everything else keeps failing fast until it succeeds.
+            if self._trial_running:
+                raise CircuitOpenError("Circuit is half-open")
+            self._trial_running = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        self._trial_running = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_running = False
+
+
+class UpstreamGuard:
+
+    def __init__(
+        self,
+        name: str,
+        total_timeout: float = 10.0,
+        connect_timeout: float = 3.0,
+        deadline: float = 10.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        max_concurrency: int = 20,
+        max_pending: int = 100,
+        failure_threshold: int = 5,
+        recovery_time: float = 30.0
+    ) -> None:
+        self.name = name
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_pending = max_pending
+        self.breaker = CircuitBreaker(failure_threshold, recovery_time)
+        self.rejected = 0
+        self.retries = 0
+        self.deadlines_exceeded = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending = 0
+
+    async def call(
+        self,
+        request: Callable[[], Awaitable[T]],
+        idempotent: bool = True
+    ) -> T:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise BulkheadFullError(f"Too many pending {self.name} requests")
+        trial = self.breaker.before_call()
+        self._pending += 1
+        started = time.monotonic()
+        try:
+            # The timeout applies to each attempt; the deadline bounds the
+            # queueing, every retry and the backoffs between them together.
+            return await asyncio.wait_for(self._call_queued(request, idempotent), self.deadline)
+        except asyncio.TimeoutError:
+            if time.monotonic() - started < self.deadline:
+                raise
+            self.deadlines_exceeded += 1
+            raise UpstreamUnavailableError(f"{self.name} call exceeded its {self.deadline:g} s deadline")
+        finally:
+            self._pending -= 1
+            # A trial cancelled in the queue, in flight or during a backoff
+            # recorded no result and would keep the circuit half-open forever.
+            if trial:
+                self.breaker.release_trial()
+
+    async def _call_queued(
+        self,
+        request: Callable[[], Awaitable[T]],
+        idempotent: bool
+    ) -> T:
+        async with self._semaphore:
+            return await self._call_with_retries(request, idempotent)
+
+    async def _call_with_retries(
+        self,
+        request: Callable[[], Awaitable[T]],
+        idempotent: bool
+    ) -> T:
+        attempt = 0
+        while True:
+            try:
+                result = await request()
+            except Exception as e:
+                if not self._is_transient(e):
+                    # The upstream answered; errors such as 401 are about the
+                    # request, not about its health.
+                    self.breaker.record_success()
+                    raise
+                if not idempotent or attempt >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                attempt += 1
+                self.retries += 1
+                # Full jitter keeps retries from many handlers from arriving
+                # at the upstream in lockstep.
+                await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+                continue
+            self.breaker.record_success()
+            return result
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in RETRYABLE_STATUSES
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from itertools import count
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from simulators import (
+    Behavior,
+    FatSecretSimulator,
+    OFFSimulator,
+    OWMSimulator,
+    parse_latency,
+    simulator_environment,
+    start_simulators
+)
+
+TOKEN = "123456:benchmark"
+
+FOODS = ["гречка", "рис", "овсянка", "макароны", "хлеб"]
+CITIES = ["Moscow", "Saint Petersburg", "Kazan", "Novosibirsk", "Sochi"]
+
+
+def configure_environment(args: argparse.Namespace, data_dir: str) -> None:
+    # config.py and the api constants read the environment at import time,
+    # so everything is set before main is imported.
+    base_url = f"http://127.0.0.1:{args.stub_port}"
+    os.environ.update({
+        "TG_BOT_TOKEN": TOKEN,
+        "DATABASE_URL": args.database_url or f"sqlite+aiosqlite:///{data_dir}/bench.db",
+        "FATSECRET_CLIENT_ID": "benchmark",
+        "FATSECRET_CLIENT_SECRET": "benchmark",
+        "OWM_API_KEY": "benchmark",
+        "DAY_ROLLOVER_ENABLED": "false",
+        "BOT_MODE": "polling",
+        **simulator_environment(base_url)
+    })
+    os.environ.pop("FATSECRET_SAVE_PATH", None)
+
+
+def make_fake_session(latency: float):
+    from aiogram.client.session.base import BaseSession
+    from aiogram.methods import EditMessageText, SendMessage, SendPhoto
+    from aiogram.types import Message
+
+    class FakeTelegramSession(BaseSession):
+
+        def __init__(self) -> None:
+            super().__init__()
+            self._message_ids = count(1)
+
+        async def make_request(self, bot, method, timeout=None):
+            if latency:
+                await asyncio.sleep(latency)
+            if not isinstance(method, (SendMessage, SendPhoto, EditMessageText)):
+                return True
+            message = {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": method.chat_id or 0, "type": "private"},
+                "text": getattr(method, "text", None)
+            }
+            if isinstance(method, SendPhoto):
+                message["photo"] = [{
+                    "file_id": f"photo-{message['message_id']}",
+                    "file_unique_id": f"photo-{message['message_id']}",
+                    "width": 800,
+                    "height": 600
+                }]
+            return Message.model_validate(message, context={"bot": bot})
+
+        async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+            yield b""
+
+        async def close(self) -> None:
+            pass
+
+    return FakeTelegramSession()
+
+
+def user_scenario(user_id: int, rounds: int) -> list[tuple[str, str, str]]:
+    food = FOODS[user_id % len(FOODS)]
+    steps = [
+        ("message", "/start", "/start"),
+        ("message", "/set_profile", "/set_profile"),
+        ("message", "70", "profile:weight"),
+        ("message", "180", "profile:height"),
+        ("message", "30", "profile:age"),
+        ("message", "60", "profile:activity"),
+        ("message", CITIES[user_id % len(CITIES)], "profile:city"),
+        ("callback_query", "use_default", "profile:calorie_goal"),
+        ("callback_query", "confirm_yes", "profile:confirmation")
+    ]
+    for _ in range(rounds):
+        steps += [
+            ("message", "/log_water 250", "/log_water"),
+            ("message", f"/log_food {food}", "/log_food"),
+            ("message", "150", "log_food:amount"),
+            ("message", "/log_workout бег 30", "/log_workout"),
+            ("message", "/progress", "/progress"),
+            ("message", "/weekly_water", "/weekly_water"),
+            ("message", "/weekly_calories", "/weekly_calories")
+        ]
+    return steps
+
+
+def make_update(bot, update_id: int, user_id: int, kind: str, payload: str):
+    from aiogram.types import Update
+
+    user = {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": user_id, "type": "private"},
+        "from": user
+    }
+    if kind == "message":
+        data = {"update_id": update_id, "message": {**message, "text": payload}}
+    else:
+        data = {
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": user,
+                "chat_instance": str(user_id),
+                "message": {**message, "text": "", "from": {"id": 1, "is_bot": True, "first_name": "bot"}},
+                "data": payload
+            }
+        }
+    return Update.model_validate(data, context={"bot": bot})
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def format_latencies(values: list[float]) -> str:
+    return (
+        f"p50 {percentile(values, 0.5):7.1f}  "
+        f"p95 {percentile(values, 0.95):7.1f}  "
+        f"p99 {percentile(values, 0.99):7.1f}  "
+        f"max {max(values):7.1f}"
+    )
+
+
+async def run_benchmark(args: argparse.Namespace) -> int:
+    behaviors = {
+        name: Behavior(
+            latency=args.upstream_latency,
+            error_rate=args.upstream_error_rate,
+            rate_limit=args.upstream_rate_limit,
+            seed=args.seed + index
+        )
+        for index, name in enumerate(("fatsecret", "owm", "off"))
+    }
+    fatsecret = FatSecretSimulator(behaviors["fatsecret"], token_ttl=args.token_ttl)
+    stub_runner = await start_simulators(
+        "127.0.0.1",
+        args.stub_port,
+        fatsecret=fatsecret,
+        owm=OWMSimulator(behaviors["owm"]),
+        off=OFFSimulator(behaviors["off"])
+    )
+
+    data_dir = tempfile.mkdtemp(prefix="dispatcher-bench-")
+    configure_environment(args, data_dir)
+    os.chdir(ROOT)
+    from aiogram import Bot
+
+    import main
+
+    bot = Bot(token=TOKEN, session=make_fake_session(args.telegram_latency / 1000))
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    update_ids = count(1)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def simulate_user(dp, user_id: int) -> None:
+        # Each fake user sends its next update only after the previous one
+        # was handled, like a person waiting for the bot's answer.
+        for kind, payload, label in user_scenario(user_id, args.rounds):
+            update = make_update(bot, next(update_ids), user_id, kind, payload)
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await dp.feed_update(bot, update)
+                except Exception:
+                    errors[label] += 1
+                    continue
+                latencies[label].append((time.perf_counter() - started) * 1000)
+
+    try:
+        async with main.build_dispatcher() as dp:
+            started = time.perf_counter()
+            await asyncio.gather(*(simulate_user(dp, 10_000 + i) for i in range(args.users)))
+            elapsed = time.perf_counter() - started
+    finally:
+        await bot.session.close()
+        await stub_runner.cleanup()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    handled = len(all_latencies)
+    print(f"users: {args.users}, updates: {handled} ok, {sum(errors.values())} failed, {elapsed:.1f} s")
+    print(f"throughput: {handled / elapsed:.1f} updates/s")
+    for name, behavior in behaviors.items():
+        print(f"{name} requests: {dict(behavior.outcomes)}")
+    print(f"fatsecret tokens issued: {fatsecret.tokens_issued}")
+    if not all_latencies:
+        return 1
+    print(f"{'step':<24}{'count':>7}  latency ms")
+    for label, values in latencies.items():
+        print(f"{label:<24}{len(values):>7}  {format_latencies(values)}")
+    print(f"{'total':<24}{handled:>7}  {format_latencies(all_latencies)}")
+    p95 = percentile(all_latencies, 0.95)
+    if args.max_p95 is not None and p95 > args.max_p95:
+        print(f"FAIL: p95 {p95:.1f} ms is above {args.max_p95:.1f} ms")
+        return 1
+    if errors:
+        print(f"FAIL: handler errors {dict(errors)}")
+        return 1
+    return 0
+
+
+def latency_spec(value: str) -> str:
+    try:
+        parse_latency(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Drive the bot's Dispatcher with synthetic users and measure handler latency")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3, help="logging rounds per user after the profile flow")
+    parser.add_argument("--concurrency", type=int, default=50, help="updates handled at the same time")
+    parser.add_argument("--upstream-latency", type=latency_spec, default="lognormal:20:0.5", help="simulated FatSecret/OWM/OFF latency, ms, see python -m simulators --help")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--upstream-rate-limit", type=int, default=0, help="requests per second per provider")
+    parser.add_argument("--token-ttl", type=int, default=86400, help="FatSecret access token lifetime, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="fake Bot API latency, ms")
+    parser.add_argument("--stub-port", type=int, default=8083)
+    parser.add_argument("--database-url", help="defaults to a SQLite file in a temporary directory")
+    parser.add_argument("--max-p95", type=float, help="exit with 1 if the overall p95 in ms is above this")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING if args.verbose else logging.ERROR)
+    sys.exit(asyncio.run(run_benchmark(args)))
@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+from aiohttp import ClientSession, web
+
+ROOT = Path(__file__).resolve().parent.parent
+TOKEN = "123456:benchmark"
+
+
+class FakeTelegramAPI:
+
+    def __init__(self) -> None:
+        self.ready = asyncio.Event()
+        self._waiters: dict[int, deque[asyncio.Future]] = defaultdict(deque)
+        self._message_id = 0
+
+    def expect_reply(self, chat_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[chat_id].append(future)
+        return future
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await request.post()
+        if method == "setWebhook":
+            self.ready.set()
+            return web.json_response({"ok": True, "result": True})
+        if method in ("sendMessage", "sendPhoto"):
+            chat_id = int(params["chat_id"])
+            waiters = self._waiters.get(chat_id)
+            if waiters:
+                future = waiters.popleft()
+                if not future.done():
+                    future.set_result(time.perf_counter())
+            self._message_id += 1
+            return web.json_response({
+                "ok": True,
+                "result": {
+                    "message_id": self._message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"},
+                    "text": params.get("text", "")
+                }
+            })
+        return web.json_response({"ok": True, "result": True})
+
+
+def make_update(update_id: int, user_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            "text": text
+        }
+    }
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_benchmark(args: argparse.Namespace) -> None:
+    api = FakeTelegramAPI()
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", api.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.api_port).start()
+
+    data_dir = tempfile.mkdtemp(prefix="webhook-bench-")
+    env = {
+        **os.environ,
+        "TG_BOT_TOKEN": TOKEN,
+        "TELEGRAM_API_URL": f"http://127.0.0.1:{args.api_port}",
+        "DATABASE_URL": f"sqlite+aiosqlite:///{data_dir}/bench.db",
+        "BOT_MODE": "webhook",
+        "WEBHOOK_URL": f"http://127.0.0.1:{args.port}",
+        "WEBHOOK_HOST": "127.0.0.1",
+        "WEBHOOK_PORT": str(args.port),
+        "WEBHOOK_SECRET": "benchmark-secret",
+        "WEBHOOK_MAX_CONCURRENT_UPDATES": str(args.max_concurrent_updates),
+        "DAY_ROLLOVER_ENABLED": "false"
+    }
+    bot_process = await asyncio.create_subprocess_exec(
+        sys.executable, "main.py",
+        cwd=ROOT,
+        env=env,
+        stdout=None if args.verbose else asyncio.subprocess.DEVNULL,
+        stderr=None if args.verbose else asyncio.subprocess.DEVNULL
+    )
+    try:
+        await asyncio.wait_for(api.ready.wait(), args.startup_timeout)
+        url = f"http://127.0.0.1:{args.port}/webhook"
+        headers = {"X-Telegram-Bot-Api-Secret-Token": "benchmark-secret"}
+        latencies: list[float] = []
+        failures = 0
+        update_ids = iter(range(1, args.updates + 1))
+
+        async def worker(worker_id: int, session: ClientSession) -> None:
+            nonlocal failures
+            users = range(1000 + worker_id, 1000 + args.users, args.concurrency)
+            for update_id in update_ids:
+                user_id = users[update_id % len(users)]
+                reply = api.expect_reply(user_id)
+                started = time.perf_counter()
+                async with session.post(url, json=make_update(update_id, user_id, args.text), headers=headers) as response:
+                    await response.read()
+                try:
+                    finished = await asyncio.wait_for(reply, args.reply_timeout)
+                except asyncio.TimeoutError:
+                    failures += 1
+                    continue
+                latencies.append((finished - started) * 1000)
+
+        started = time.perf_counter()
+        async with ClientSession() as session:
+            await asyncio.gather(*(worker(i, session) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        if bot_process.returncode is None:
+            bot_process.terminate()
+            await bot_process.wait()
+        await runner.cleanup()
+
+    print(f"updates: {len(latencies)} ok, {failures} without reply")
+    print(f"throughput: {len(latencies) / elapsed:.1f} updates/s")
+    if latencies:
+        print(
+            f"latency ms: mean {statistics.mean(latencies):.1f}, "
+            f"p50 {percentile(latencies, 0.5):.1f}, "
+            f"p95 {percentile(latencies, 0.95):.1f}, "
+            f"p99 {percentile(latencies, 0.99):.1f}, "
+            f"max {max(latencies):.1f}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure end-to-end webhook handler latency")
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--text", default="/start")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--api-port", type=int, default=8082)
+    parser.add_argument("--max-concurrent-updates", type=int, default=100)
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--reply-timeout", type=float, default=10.0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    args.users = max(args.users, args.concurrency)
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark(parse_args()))
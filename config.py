@@ -4,8 +4,42 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+SQLITE_PERFORMANCE_MODE = os.getenv("SQLITE_PERFORMANCE_MODE", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_WRITER_BATCH_SIZE = int(os.getenv("SQLITE_WRITER_BATCH_SIZE", "64"))
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
 
 TG_BOT_TOKEN = os.getenv("TG_BOT_TOKEN")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
+
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+WEBHOOK_MAX_CONCURRENT_UPDATES = int(os.getenv("WEBHOOK_MAX_CONCURRENT_UPDATES", "100"))
+WEBHOOK_SHUTDOWN_TIMEOUT = float(os.getenv("WEBHOOK_SHUTDOWN_TIMEOUT", "10"))
+SHARD_WORKER_URLS = [url.strip() for url in os.getenv("SHARD_WORKER_URLS", "").split(",") if url.strip()]
+SHARD_FORWARD_TIMEOUT = float(os.getenv("SHARD_FORWARD_TIMEOUT", "25"))
+
+USER_QUEUE_MAX_DEPTH = int(os.getenv("USER_QUEUE_MAX_DEPTH", "10"))
+
+FSM_STORAGE = os.getenv("FSM_STORAGE", "memory")
+FSM_STATE_TTL = float(os.getenv("FSM_STATE_TTL", "86400"))
 
 OWM_API_KEY = os.getenv("OWM_API_KEY")
 
@@ -14,4 +48,49 @@ FATSECRET_CLIENT_SECRET = os.getenv("FATSECRET_CLIENT_SECRET")
 
 FATSECRET_SAVE_PATH = os.getenv("FATSECRET_SAVE_PATH")
 
-EXERCISES_CONFIG_PATH = "exercises.yaml"
\ No newline at end of file
+EXERCISES_CONFIG_PATH = "exercises.yaml"
+
+FOOD_TRANSLATIONS_PATH = os.getenv("FOOD_TRANSLATIONS_PATH", "food_translations.yaml")
+
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+
+FATSECRET_TIMEOUT = float(os.getenv("FATSECRET_TIMEOUT", "10"))
+OWM_TIMEOUT = float(os.getenv("OWM_TIMEOUT", "5"))
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3"))
+API_CALL_DEADLINE = float(os.getenv("API_CALL_DEADLINE", "10"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
+API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.2"))
+API_RETRY_BACKOFF_MAX = float(os.getenv("API_RETRY_BACKOFF_MAX", "2"))
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "20"))
+API_MAX_PENDING = int(os.getenv("API_MAX_PENDING", "100"))
+API_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("API_CIRCUIT_FAILURE_THRESHOLD", "5"))
+API_CIRCUIT_RECOVERY_TIME = float(os.getenv("API_CIRCUIT_RECOVERY_TIME", "30"))
+
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "3600"))
+
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "10000"))
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", "600"))
+
+DAY_ROLLOVER_ENABLED = os.getenv("DAY_ROLLOVER_ENABLED", "true").lower() == "true"
+DAY_ROLLOVER_LEAD_TIME = float(os.getenv("DAY_ROLLOVER_LEAD_TIME", "7200"))
+DAY_ROLLOVER_CHUNK_SIZE = int(os.getenv("DAY_ROLLOVER_CHUNK_SIZE", "500"))
+
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "2"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "500"))
+
+FOOD_CACHE_SIZE = int(os.getenv("FOOD_CACHE_SIZE", "1024"))
+FOOD_CACHE_TTL = float(os.getenv("FOOD_CACHE_TTL", str(30 * 24 * 3600)))
+FOOD_CACHE_NEGATIVE_TTL = float(os.getenv("FOOD_CACHE_NEGATIVE_TTL", "900"))
+
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "4096"))
+TRANSLATION_BATCH_WINDOW = float(os.getenv("TRANSLATION_BATCH_WINDOW", "0.05"))
+TRANSLATION_MAX_BATCH_SIZE = int(os.getenv("TRANSLATION_MAX_BATCH_SIZE", "32"))
+
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "2"))
+CHART_MAX_PENDING = int(os.getenv("CHART_MAX_PENDING", "8"))
+CHART_RENDER_TIMEOUT = float(os.getenv("CHART_RENDER_TIMEOUT", "10"))
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "256"))
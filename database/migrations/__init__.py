@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+MIGRATIONS_PATH = Path(__file__).resolve().parent
+BASELINE_REVISION = "0001"
+# Arbitrary application-wide key for pg_advisory_xact_lock.
+MIGRATIONS_LOCK_KEY = 7_236_401_112
+
+
+def run_migrations(connection: Connection) -> None:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_PATH))
+    config.attributes["connection"] = connection
+    if connection.dialect.name == "postgresql":
+        # Several workers may start at once; the rest wait here until the
+        # first one has committed the upgrade and then find nothing to do.
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+    tables = set(inspect(connection).get_table_names())
+    if "users" in tables and "alembic_version" not in tables:
+        # Databases bootstrapped by Base.metadata.create_all() already have
+        # the initial schema, so they only need to be marked as such.
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
@@ -0,0 +1,63 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("telegram_id", sa.BigInteger(), nullable=False),
+        sa.UniqueConstraint("telegram_id")
+    )
+    op.create_table(
+        "health_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("height", sa.Float(), nullable=False),
+        sa.Column("age", sa.Integer(), nullable=False),
+        sa.Column("activity", sa.Integer(), nullable=False),
+        sa.Column("city", sa.String(), nullable=False),
+        sa.Column("calorie_goal", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("user_id")
+    )
+    op.create_table(
+        "daily_water_stats",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("water_goal", sa.Integer(), nullable=False),
+        sa.Column("water_consumed", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("user_id", "day", name="uq_daily_water_stats_user_day")
+    )
+    op.create_table(
+        "daily_calories_stats",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("calories_goal", sa.Integer(), nullable=False),
+        sa.Column("calories_consumed", sa.Integer(), nullable=False),
+        sa.Column("calories_burned", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("user_id", "day", name="uq_daily_calories_stats_user_day")
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_calories_stats")
+    op.drop_table("daily_water_stats")
+    op.drop_table("health_profiles")
+    op.drop_table("users")
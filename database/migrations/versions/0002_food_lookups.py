@@ -0,0 +1,39 @@
+"""food lookup cache
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases bootstrapped with create_all() after the cache was added
+    # already have this table.
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table("food_lookups"):
+        return
+    op.create_table(
+        "food_lookups",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("food_name", sa.String(), nullable=False),
+        sa.Column("translated_name", sa.String(), nullable=True),
+        sa.Column("calories", sa.Float(), nullable=True),
+        sa.Column("fat", sa.Float(), nullable=True),
+        sa.Column("carbs", sa.Float(), nullable=True),
+        sa.Column("protein", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("food_name")
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("food_lookups")
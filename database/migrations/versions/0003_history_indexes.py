@@ -0,0 +1,33 @@
+"""covering indexes for history queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_daily_water_stats_history",
+        "daily_water_stats",
+        ["user_id", "day", "water_consumed"]
+    )
+    op.create_index(
+        "ix_daily_calories_stats_history",
+        "daily_calories_stats",
+        ["user_id", "day", "calories_consumed", "calories_burned"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_daily_calories_stats_history", table_name="daily_calories_stats")
+    op.drop_index("ix_daily_water_stats_history", table_name="daily_water_stats")
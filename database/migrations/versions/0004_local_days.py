@@ -0,0 +1,44 @@
+"""per-user timezone and server-side day default
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "health_profiles",
+        sa.Column("utc_offset", sa.Integer(), nullable=False, server_default="0")
+    )
+    for table in ("daily_water_stats", "daily_calories_stats"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "day",
+                existing_type=sa.Date(),
+                existing_nullable=False,
+                server_default=sa.func.current_date()
+            )
+
+
+def downgrade() -> None:
+    for table in ("daily_calories_stats", "daily_water_stats"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "day",
+                existing_type=sa.Date(),
+                existing_nullable=False,
+                server_default=None
+            )
+    with op.batch_alter_table("health_profiles") as batch_op:
+        batch_op.drop_column("utc_offset")
@@ -0,0 +1,39 @@
+"""daily goals precomputation checkpoints and profile timezone index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_goals_checkpoints",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("utc_offset", sa.Integer(), nullable=False),
+        sa.Column("last_user_id", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Boolean(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("day", "utc_offset", name="uq_daily_goals_checkpoints_day_offset")
+    )
+    op.create_index(
+        "ix_health_profiles_utc_offset_user",
+        "health_profiles",
+        ["utc_offset", "user_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_health_profiles_utc_offset_user", table_name="health_profiles")
+    op.drop_table("daily_goals_checkpoints")
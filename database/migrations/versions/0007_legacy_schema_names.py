@@ -0,0 +1,49 @@
+"""align create_all-bootstrapped databases with the migrated schema
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LEGACY_UNIQUE_NAME = "unique_user_day"
+
+
+def upgrade() -> None:
+    # Databases created by Base.metadata.create_all() before migrations were
+    # stamped at 0001 as they were: both daily tables kept the old shared
+    # unique constraint name and telegram_id stayed a 32-bit integer.
+    if context.is_offline_mode():
+        return
+    inspector = sa.inspect(op.get_bind())
+    for table in ("daily_water_stats", "daily_calories_stats"):
+        names = {constraint["name"] for constraint in inspector.get_unique_constraints(table)}
+        if LEGACY_UNIQUE_NAME not in names:
+            continue
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(LEGACY_UNIQUE_NAME, type_="unique")
+            batch_op.create_unique_constraint(f"uq_{table}_user_day", ["user_id", "day"])
+    columns = {column["name"]: column for column in inspector.get_columns("users")}
+    if not isinstance(columns["telegram_id"]["type"], sa.BigInteger):
+        with op.batch_alter_table("users") as batch_op:
+            batch_op.alter_column(
+                "telegram_id",
+                existing_type=sa.Integer(),
+                existing_nullable=False,
+                type_=sa.BigInteger()
+            )
+
+
+def downgrade() -> None:
+    # The legacy names are not restored; the migrated schema is valid for
+    # every earlier revision.
+    pass
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped, relationship
-from sqlalchemy import Date, ForeignKey, UniqueConstraint
-from datetime import datetime, date, timezone
-from typing import List
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Index, Text, UniqueConstraint, func
+from datetime import datetime, date
+from typing import List, Optional
 
 
 class Base(DeclarativeBase):
@@ -12,7 +12,7 @@ class User(Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    telegram_id: Mapped[int] = mapped_column(unique=True, nullable=False)
+    telegram_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False)
     
     health_profile: Mapped["HealthProfile"] = relationship("HealthProfile", back_populates="user", uselist=False)
     daily_water_stats: Mapped[List["DailyWaterStats"]] = relationship("DailyWaterStats", back_populates="user")
@@ -30,22 +30,30 @@ class HealthProfile(Base):
     activity: Mapped[int] = mapped_column(nullable=False)
     city: Mapped[str] = mapped_column(nullable=False)
     calorie_goal: Mapped[int] = mapped_column(nullable=False)
+    utc_offset: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
     
     user: Mapped["User"] = relationship("User", back_populates="health_profile")
 
+    __table_args__ = (Index("ix_health_profiles_utc_offset_user", "utc_offset", "user_id"),)
+
 
 class DailyWaterStats(Base):
     __tablename__ = "daily_water_stats"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    day: Mapped[date] = mapped_column(Date, nullable=False, default=datetime.now(timezone.utc).date())
+    day: Mapped[date] = mapped_column(Date, nullable=False, server_default=func.current_date())
     water_goal: Mapped[int] = mapped_column(nullable=False)
     water_consumed: Mapped[int] = mapped_column(nullable=False, default=0)
 
     user: Mapped["User"] = relationship("User", back_populates="daily_water_stats")
     
-    __table_args__ = (UniqueConstraint("user_id", "day", name="unique_user_day"),)
+    # The unique (user_id, day) index serves point lookups and upserts; the
+    # wider one lets history queries be answered from the index alone.
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_daily_water_stats_user_day"),
+        Index("ix_daily_water_stats_history", "user_id", "day", "water_consumed"),
+    )
 
 
 class DailyCaloriesStats(Base):
@@ -53,11 +61,49 @@ class DailyCaloriesStats(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    day: Mapped[date] = mapped_column(Date, nullable=False, default=datetime.now(timezone.utc).date())
+    day: Mapped[date] = mapped_column(Date, nullable=False, server_default=func.current_date())
     calories_goal: Mapped[int] = mapped_column(nullable=False)
     calories_consumed: Mapped[int] = mapped_column(nullable=False, default=0)
     calories_burned: Mapped[int] = mapped_column(nullable=False, default=0)
 
     user: Mapped["User"] = relationship("User", back_populates="daily_calories_stats")
     
-    __table_args__ = (UniqueConstraint("user_id", "day", name="unique_user_day"),)
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_daily_calories_stats_user_day"),
+        Index("ix_daily_calories_stats_history", "user_id", "day", "calories_consumed", "calories_burned"),
+    )
+
+
+class FoodLookup(Base):
+    __tablename__ = "food_lookups"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    food_name: Mapped[str] = mapped_column(unique=True, nullable=False)
+    translated_name: Mapped[Optional[str]] = mapped_column(nullable=True)
+    calories: Mapped[Optional[float]] = mapped_column(nullable=True)
+    fat: Mapped[Optional[float]] = mapped_column(nullable=True)
+    carbs: Mapped[Optional[float]] = mapped_column(nullable=True)
+    protein: Mapped[Optional[float]] = mapped_column(nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+class DailyGoalsCheckpoint(Base):
+    __tablename__ = "daily_goals_checkpoints"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    utc_offset: Mapped[int] = mapped_column(nullable=False)
+    last_user_id: Mapped[int] = mapped_column(nullable=False, default=0)
+    completed: Mapped[bool] = mapped_column(nullable=False, default=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (UniqueConstraint("day", "utc_offset", name="uq_daily_goals_checkpoints_day_offset"),)
+
+
+class FsmRecord(Base):
+    __tablename__ = "fsm_records"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    key: Mapped[str] = mapped_column(unique=True, nullable=False)
+    state: Mapped[Optional[str]] = mapped_column(nullable=True)
+    data: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,36 +1,46 @@
-from datetime import date
+import logging
+from datetime import date, datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select, update, delete, and_, bindparam
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from .models import (
     User,
     HealthProfile,
     DailyWaterStats,
-    DailyCaloriesStats
+    DailyCaloriesStats,
+    DailyGoalsCheckpoint,
+    FoodLookup,
+    FsmRecord
 )
 
+logger = logging.getLogger(__name__)
+
 
 class Repository:
 
     def __init__(
         self,
-        session: AsyncSession
+        session: AsyncSession,
+        autocommit: bool = True
     ) -> None:
         self.session = session
+        self.autocommit = autocommit
 
     async def add_user(
         self,
         telegram_id: int
-    ) -> bool:
+    ) -> User | None:
         try:
             new_user = User(telegram_id=telegram_id)
             self.session.add(new_user)
-            await self.session.commit()
-            return True
+            await self._commit()
+            return new_user
         except Exception as e:
-            await self.session.rollback()
-            print(f"Failed to add user: {str(e)}")
-            return False
+            await self._rollback(e)
+            logger.error("Failed to add user: %s", e)
+            return None
     
     async def get_user_by_telegram_id(
             self,
@@ -40,6 +50,20 @@ class Repository:
                 select(User).where(User.telegram_id == telegram_id)
             )
             return result.scalars().first()
+
+    async def get_user_with_profile(
+        self,
+        telegram_id: int
+    ) -> tuple[int, HealthProfile | None] | None:
+        result = await self.session.execute(
+            select(User.id, HealthProfile)
+            .outerjoin(HealthProfile, HealthProfile.user_id == User.id)
+            .where(User.telegram_id == telegram_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return row[0], row[1]
         
     async def update_health_profile(
         self,
@@ -49,7 +73,8 @@ class Repository:
         age: int,
         activity: int,
         city: str,
-        calorie_goal: int
+        calorie_goal: int,
+        utc_offset: int = 0
     ) -> bool:
         try:
             result = await self.session.execute(
@@ -63,6 +88,7 @@ class Repository:
                 profile.activity = activity
                 profile.city = city
                 profile.calorie_goal = calorie_goal
+                profile.utc_offset = utc_offset
             else:
                 new_profile = HealthProfile(
                     user_id=user_id,
@@ -71,14 +97,15 @@ class Repository:
                     age=age,
                     activity=activity,
                     city=city,
-                    calorie_goal=calorie_goal
+                    calorie_goal=calorie_goal,
+                    utc_offset=utc_offset
                 )
                 self.session.add(new_profile)
-            await self.session.commit()
+            await self._commit()
             return True
         except Exception as e:
-            await self.session.rollback()
-            print(f"Failed to update health profile: {str(e)}")
+            await self._rollback(e)
+            logger.error("Failed to update health profile: %s", e)
             return False
 
     async def get_health_profile(
@@ -90,39 +117,32 @@ class Repository:
         )
         return result.scalars().first()
     
-    async def update_daily_water_stats(
+    async def increment_daily_water_stats(
         self,
         user_id: int,
         day: date,
         water_goal: int,
-        water_consumed: int | None = None
+        water_consumed_delta: int = 0,
+        water_goal_delta: int = 0
     ) -> DailyWaterStats | None:
         try:
+            statement = self._water_increment_statement(
+                user_id=user_id,
+                day=day,
+                water_goal=water_goal,
+                water_consumed_delta=water_consumed_delta,
+                water_goal_delta=water_goal_delta
+            )
             result = await self.session.execute(
-                select(DailyWaterStats).where(
-                    DailyWaterStats.user_id == user_id,
-                    DailyWaterStats.day == day
-                )
+                statement,
+                execution_options={"populate_existing": True}
             )
             stats = result.scalars().first()
-            if stats:
-                if water_consumed is not None:
-                    stats.water_consumed = water_consumed
-                    stats.water_goal = water_goal
-            else:
-                new_stats = DailyWaterStats(
-                    user_id=user_id,
-                    day=day,
-                    water_goal=water_goal,
-                    water_consumed=water_consumed or 0
-                )
-                self.session.add(new_stats)
-                stats = new_stats
-            await self.session.commit()
+            await self._commit()
             return stats
         except Exception as e:
-            await self.session.rollback()
-            print(f"Failed to update daily water stats: {str(e)}")
+            await self._rollback(e)
+            logger.error("Failed to increment daily water stats: %s", e)
             return
 
     async def get_daily_water_stat(
@@ -138,42 +158,32 @@ class Repository:
         )
         return result.scalars().first()
     
-    async def update_daily_calories_stats(
+    async def increment_daily_calories_stats(
         self,
         user_id: int,
         day: date,
         calories_goal: int,
-        calories_consumed: int | None = None,
-        calories_burned: int | None = None
+        calories_consumed_delta: int = 0,
+        calories_burned_delta: int = 0
     ) -> DailyCaloriesStats | None:
         try:
+            statement = self._calories_increment_statement(
+                user_id=user_id,
+                day=day,
+                calories_goal=calories_goal,
+                calories_consumed_delta=calories_consumed_delta,
+                calories_burned_delta=calories_burned_delta
+            )
             result = await self.session.execute(
-                select(DailyCaloriesStats).where(
-                    DailyCaloriesStats.user_id == user_id,
-                    DailyCaloriesStats.day == day
-                )
+                statement,
+                execution_options={"populate_existing": True}
             )
             stats = result.scalars().first()
-            if stats:
-                if calories_consumed is not None:
-                    stats.calories_consumed = calories_consumed
-                if calories_burned is not None:
-                    stats.calories_burned = calories_burned
-            else:
-                new_stats = DailyCaloriesStats(
-                    user_id=user_id,
-                    day=day,
-                    calories_goal=calories_goal,
-                    calories_consumed=calories_consumed or 0,
-                    calories_burned=calories_burned or 0
-                )
-                self.session.add(new_stats)
-                stats = new_stats
-            await self.session.commit()
+            await self._commit()
             return stats
         except Exception as e:
-            await self.session.rollback()
-            print(f"Failed to update daily calories stats: {str(e)}")
+            await self._rollback(e)
+            logger.error("Failed to increment daily calories stats: %s", e)
             return
 
     async def get_daily_calories_stat(
@@ -189,36 +199,498 @@ class Repository:
         )
         return result.scalars().first()
     
+    async def get_daily_progress(
+        self,
+        telegram_id: int,
+        day: date
+    ) -> tuple[int, HealthProfile | None, DailyWaterStats | None, DailyCaloriesStats | None] | None:
+        result = await self.session.execute(
+            select(User.id, HealthProfile, DailyWaterStats, DailyCaloriesStats)
+            .select_from(User)
+            .outerjoin(HealthProfile, HealthProfile.user_id == User.id)
+            .outerjoin(
+                DailyWaterStats,
+                and_(DailyWaterStats.user_id == User.id, DailyWaterStats.day == day)
+            )
+            .outerjoin(
+                DailyCaloriesStats,
+                and_(DailyCaloriesStats.user_id == User.id, DailyCaloriesStats.day == day)
+            )
+            .where(User.telegram_id == telegram_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return row[0], row[1], row[2], row[3]
+
+    async def create_daily_stats(
+        self,
+        user_id: int,
+        day: date,
+        water_goal: int,
+        calories_goal: int
+    ) -> tuple[DailyWaterStats, DailyCaloriesStats] | None:
+        try:
+            water_result = await self.session.execute(
+                self._water_increment_statement(user_id=user_id, day=day, water_goal=water_goal),
+                execution_options={"populate_existing": True}
+            )
+            calories_result = await self.session.execute(
+                self._calories_increment_statement(user_id=user_id, day=day, calories_goal=calories_goal),
+                execution_options={"populate_existing": True}
+            )
+            water_stats = water_result.scalars().first()
+            calories_stats = calories_result.scalars().first()
+            await self._commit()
+            return water_stats, calories_stats
+        except Exception as e:
+            await self._rollback(e)
+            logger.error("Failed to create daily stats: %s", e)
+            return
+
+    async def get_utc_offsets(self) -> list[int]:
+        result = await self.session.execute(
+            select(HealthProfile.utc_offset).distinct()
+        )
+        return list(result.scalars().all())
+
+    async def get_profiles_by_utc_offset(
+        self,
+        utc_offset: int,
+        after_user_id: int = 0,
+        limit: int = 500
+    ) -> list[Row]:
+        result = await self.session.execute(
+            select(
+                HealthProfile.user_id,
+                User.telegram_id,
+                HealthProfile.weight,
+                HealthProfile.activity,
+                HealthProfile.city,
+                HealthProfile.calorie_goal
+            )
+            .join(User, User.id == HealthProfile.user_id)
+            .where(
+                HealthProfile.utc_offset == utc_offset,
+                HealthProfile.user_id > after_user_id
+            )
+            .order_by(HealthProfile.user_id)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def update_utc_offsets(
+        self,
+        utc_offsets: dict[int, int]
+    ) -> bool:
+        if not utc_offsets:
+            return True
+        profiles_table = HealthProfile.__table__
+        try:
+            await self.session.execute(
+                update(profiles_table)
+                .where(profiles_table.c.user_id == bindparam("b_user_id"))
+                .values(utc_offset=bindparam("b_utc_offset")),
+                [
+                    {"b_user_id": user_id, "b_utc_offset": utc_offset}
+                    for user_id, utc_offset in utc_offsets.items()
+                ]
+            )
+            await self._commit()
+            return True
+        except Exception as e:
+            await self._rollback(e)
+            logger.error("Failed to update utc offsets: %s", e)
+            return False
+
+    async def insert_daily_stats(
+        self,
+        rows: list[dict]
+    ) -> bool:
+        if not rows:
+            return True
+        water_rows = [
+            {
+                "user_id": row["user_id"],
+                "day": row["day"],
+                "water_goal": row["water_goal"],
+                "water_consumed": 0
+            }
+            for row in rows
+        ]
+        calories_rows = [
+            {
+                "user_id": row["user_id"],
+                "day": row["day"],
+                "calories_goal": row["calories_goal"],
+                "calories_consumed": 0,
+                "calories_burned": 0
+            }
+            for row in rows
+        ]
+        try:
+            await self.session.execute(
+                self._insert(DailyWaterStats).on_conflict_do_nothing(
+                    index_elements=[DailyWaterStats.user_id, DailyWaterStats.day]
+                ),
+                water_rows
+            )
+            await self.session.execute(
+                self._insert(DailyCaloriesStats).on_conflict_do_nothing(
+                    index_elements=[DailyCaloriesStats.user_id, DailyCaloriesStats.day]
+                ),
+                calories_rows
+            )
+            await self._commit()
+            return True
+        except Exception as e:
+            await self._rollback(e)
+            logger.error("Failed to insert daily stats: %s", e)
+            return False
+
+    async def get_daily_goals_checkpoint(
+        self,
+        day: date,
+        utc_offset: int
+    ) -> DailyGoalsCheckpoint | None:
+        result = await self.session.execute(
+            select(DailyGoalsCheckpoint).where(
+                DailyGoalsCheckpoint.day == day,
+                DailyGoalsCheckpoint.utc_offset == utc_offset
+            )
+        )
+        return result.scalars().first()
+
+    async def save_daily_goals_checkpoint(
+        self,
+        day: date,
+        utc_offset: int,
+        last_user_id: int,
+        completed: bool,
+        updated_at: datetime
+    ) -> bool:
+        try:
+            statement = self._insert(DailyGoalsCheckpoint).values(
+                day=day,
+                utc_offset=utc_offset,
+                last_user_id=last_user_id,
+                completed=completed,
+                updated_at=updated_at
+            )
+            await self.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[DailyGoalsCheckpoint.day, DailyGoalsCheckpoint.utc_offset],
+                    set_={
+                        "last_user_id": last_user_id,
+                        "completed": completed,
+                        "updated_at": updated_at
+                    }
+                )
+            )
+            if completed:
+                await self.session.execute(
+                    delete(DailyGoalsCheckpoint).where(DailyGoalsCheckpoint.day < day - timedelta(days=7))
+                )
+            await self._commit()
+            return True
+        except Exception as e:
+            await self._rollback(e)
+            logger.error("Failed to save daily goals checkpoint: %s", e)
+            return False
+
+    async def apply_daily_deltas(
+        self,
+        deltas: list[dict]
+    ) -> bool:
+        water_table = DailyWaterStats.__table__
+        calories_table = DailyCaloriesStats.__table__
+        water_deltas = [
+            {
+                "b_user_id": delta["user_id"],
+                "b_day": delta["day"],
+                "b_water_consumed": delta["water_consumed"],
+                "b_water_goal": delta["water_goal"]
+            }
+            for delta in deltas
+            if delta["water_consumed"] or delta["water_goal"]
+        ]
+        calories_deltas = [
+            {
+                "b_user_id": delta["user_id"],
+                "b_day": delta["day"],
+                "b_calories_consumed": delta["calories_consumed"],
+                "b_calories_burned": delta["calories_burned"]
+            }
+            for delta in deltas
+            if delta["calories_consumed"] or delta["calories_burned"]
+        ]
+        try:
+            if water_deltas:
+                await self.session.execute(
+                    update(water_table)
+                    .where(
+                        water_table.c.user_id == bindparam("b_user_id"),
+                        water_table.c.day == bindparam("b_day")
+                    )
+                    .values(
+                        water_consumed=water_table.c.water_consumed + bindparam("b_water_consumed"),
+                        water_goal=water_table.c.water_goal + bindparam("b_water_goal")
+                    ),
+                    water_deltas
+                )
+            if calories_deltas:
+                await self.session.execute(
+                    update(calories_table)
+                    .where(
+                        calories_table.c.user_id == bindparam("b_user_id"),
+                        calories_table.c.day == bindparam("b_day")
+                    )
+                    .values(
+                        calories_consumed=calories_table.c.calories_consumed + bindparam("b_calories_consumed"),
+                        calories_burned=calories_table.c.calories_burned + bindparam("b_calories_burned")
+                    ),
+                    calories_deltas
+                )
+            await self._commit()
+            return True
+        except Exception as e:
+            await self._rollback(e)
+            logger.error("Failed to apply daily deltas: %s", e)
+            return False
+
     async def get_calorie_history(
         self,
         user_id: int,
         start_date: date,
+        end_date: date,
         limit: int = 30
-    ) -> list[DailyCaloriesStats]:
+    ) -> list[Row]:
         result = await self.session.execute(
-            select(DailyCaloriesStats)
+            select(
+                DailyCaloriesStats.day,
+                DailyCaloriesStats.calories_consumed,
+                DailyCaloriesStats.calories_burned
+            )
             .where(
                 DailyCaloriesStats.user_id == user_id,
-                DailyCaloriesStats.day >= start_date
+                DailyCaloriesStats.day >= start_date,
+                DailyCaloriesStats.day <= end_date
             )
             .order_by(DailyCaloriesStats.day.desc())
             .limit(limit)
         )
-        return result.scalars().all()
+        return result.all()
     
     async def get_water_history(
         self,
         user_id: int,
         start_date: date,
+        end_date: date,
         limit: int = 30
-    ) -> list[DailyWaterStats]:
+    ) -> list[Row]:
         result = await self.session.execute(
-            select(DailyWaterStats)
+            select(
+                DailyWaterStats.day,
+                DailyWaterStats.water_consumed
+            )
             .where(
                 DailyWaterStats.user_id == user_id,
-                DailyWaterStats.day >= start_date
+                DailyWaterStats.day >= start_date,
+                DailyWaterStats.day <= end_date
             )
             .order_by(DailyWaterStats.day.desc())
             .limit(limit)
         )
-        return result.scalars().all()
\ No newline at end of file
+        return result.all()
+
+    async def get_food_lookup(
+        self,
+        food_name: str
+    ) -> FoodLookup | None:
+        result = await self.session.execute(
+            select(FoodLookup).where(FoodLookup.food_name == food_name)
+        )
+        return result.scalars().first()
+
+    async def save_food_lookup(
+        self,
+        food_name: str,
+        translated_name: str | None,
+        calories: float | None,
+        fat: float | None,
+        carbs: float | None,
+        protein: float | None,
+        updated_at: datetime
+    ) -> bool:
+        try:
+            result = await self.session.execute(
+                select(FoodLookup).where(FoodLookup.food_name == food_name)
+            )
+            lookup = result.scalars().first()
+            if lookup:
+                lookup.translated_name = translated_name
+                lookup.calories = calories
+                lookup.fat = fat
+                lookup.carbs = carbs
+                lookup.protein = protein
+                lookup.updated_at = updated_at
+            else:
+                new_lookup = FoodLookup(
+                    food_name=food_name,
+                    translated_name=translated_name,
+                    calories=calories,
+                    fat=fat,
+                    carbs=carbs,
+                    protein=protein,
+                    updated_at=updated_at
+                )
+                self.session.add(new_lookup)
+            await self._commit()
+            return True
+        except Exception as e:
+            await self._rollback(e)
+            logger.error("Failed to save food lookup: %s", e)
+            return False
+
+    async def get_fsm_record(
+        self,
+        key: str
+    ) -> FsmRecord | None:
+        result = await self.session.execute(
+            select(FsmRecord).where(FsmRecord.key == key)
+        )
+        return result.scalars().first()
+
+    async def set_fsm_state(
+        self,
+        key: str,
+        state: str | None,
+        updated_at: datetime
+    ) -> bool:
+        try:
+            statement = self._insert(FsmRecord).values(
+                key=key,
+                state=state,
+                updated_at=updated_at
+            )
+            await self.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[FsmRecord.key],
+                    set_={"state": state, "updated_at": updated_at}
+                )
+            )
+            await self._commit()
+            return True
+        except Exception as e:
+            await self._rollback(e)
+            logger.error("Failed to set FSM state: %s", e)
+            return False
+
+    async def set_fsm_data(
+        self,
+        key: str,
+        data: str | None,
+        updated_at: datetime
+    ) -> bool:
+        try:
+            statement = self._insert(FsmRecord).values(
+                key=key,
+                data=data,
+                updated_at=updated_at
+            )
+            await self.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[FsmRecord.key],
+                    set_={"data": data, "updated_at": updated_at}
+                )
+            )
+            await self._commit()
+            return True
+        except Exception as e:
+            await self._rollback(e)
+            logger.error("Failed to set FSM data: %s", e)
+            return False
+
+    async def delete_expired_fsm_records(
+        self,
+        before: datetime
+    ) -> bool:
+        try:
+            await self.session.execute(
+                delete(FsmRecord).where(FsmRecord.updated_at < before)
+            )
+            await self._commit()
+            return True
+        except Exception as e:
+            await self._rollback(e)
+            logger.error("Failed to delete expired FSM records: %s", e)
+            return False
+
+    async def release_connection(self) -> None:
+        # Ends the implicit read transaction so the pooled connection is not
+        # held while the caller waits on something else.
+        if self.autocommit and self.session.in_transaction():
+            await self.session.commit()
+
+    async def _commit(self) -> None:
+        if self.autocommit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
+
+    async def _rollback(self, error: Exception) -> None:
+        # Without autocommit the caller owns the transaction, so the error is
+        # propagated instead of silently rolling back other pending work.
+        if not self.autocommit:
+            raise error
+        await self.session.rollback()
+
+    def _insert(self, model):
+        if self.session.bind.dialect.name == "postgresql":
+            return postgresql_insert(model)
+        return sqlite_insert(model)
+
+    def _water_increment_statement(
+        self,
+        user_id: int,
+        day: date,
+        water_goal: int,
+        water_consumed_delta: int = 0,
+        water_goal_delta: int = 0
+    ):
+        statement = self._insert(DailyWaterStats).values(
+            user_id=user_id,
+            day=day,
+            water_goal=water_goal + water_goal_delta,
+            water_consumed=water_consumed_delta
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[DailyWaterStats.user_id, DailyWaterStats.day],
+            set_={
+                "water_goal": DailyWaterStats.water_goal + water_goal_delta,
+                "water_consumed": DailyWaterStats.water_consumed + water_consumed_delta
+            }
+        ).returning(DailyWaterStats)
+
+    def _calories_increment_statement(
+        self,
+        user_id: int,
+        day: date,
+        calories_goal: int,
+        calories_consumed_delta: int = 0,
+        calories_burned_delta: int = 0
+    ):
+        statement = self._insert(DailyCaloriesStats).values(
+            user_id=user_id,
+            day=day,
+            calories_goal=calories_goal,
+            calories_consumed=calories_consumed_delta,
+            calories_burned=calories_burned_delta
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[DailyCaloriesStats.user_id, DailyCaloriesStats.day],
+            set_={
+                "calories_consumed": DailyCaloriesStats.calories_consumed + calories_consumed_delta,
+                "calories_burned": DailyCaloriesStats.calories_burned + calories_burned_delta
+            }
+        ).returning(DailyCaloriesStats)
\ No newline at end of file
@@ -1,21 +1,113 @@
+import time
 from typing import AsyncGenerator
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
     AsyncSession
 )
 
-from .models import Base
+from observability.metrics import DB_QUERY_LATENCY, DB_QUERY_ERRORS
 
-from config import DATABASE_URL
+from .migrations import run_migrations
+from .writer import DatabaseWriter
+
+from config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+    SQLITE_PERFORMANCE_MODE,
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_MMAP_SIZE,
+    SQLITE_WRITER_BATCH_SIZE,
+    METRICS_ENABLED
+)
+
+
+def _engine_options(database_url: str) -> dict:
+    options = {"echo": False}
+    if make_url(database_url).get_backend_name() == "postgresql":
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+            connect_args={
+                "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+                "statement_cache_size": DB_STATEMENT_CACHE_SIZE
+            }
+        )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.close()
+
+
+def _statement_operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
 
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started"].pop()
+    DB_QUERY_LATENCY.labels(_statement_operation(statement)).observe(time.perf_counter() - started)
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+    DB_QUERY_ERRORS.labels(_statement_operation(exception_context.statement or "")).inc()
+
+
+engine = create_async_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     expire_on_commit=False
 )
 
+sqlite_performance_mode = (
+    SQLITE_PERFORMANCE_MODE
+    and make_url(DATABASE_URL).get_backend_name() == "sqlite"
+)
+if sqlite_performance_mode:
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+if METRICS_ENABLED:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+# SQLite allows a single writer at a time, so in performance mode every write
+# goes through one task instead of competing for the database lock.
+db_writer = DatabaseWriter(
+    AsyncSessionLocal,
+    max_batch_size=SQLITE_WRITER_BATCH_SIZE
+) if sqlite_performance_mode else None
+
 async def init_db() -> None:
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(run_migrations)
+    if db_writer:
+        await db_writer.start()
+
+
+async def close_db() -> None:
+    if db_writer:
+        await db_writer.close()
+    await engine.dispose()
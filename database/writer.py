@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .repository import Repository
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[Repository], Awaitable[T]]
+
+
+class DatabaseWriter:
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_batch_size: int = 64
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self._queue: asyncio.Queue[tuple[WriteJob, asyncio.Future]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, job: WriteJob[T]) -> T:
+        if self._task is None:
+            async with self.session_factory() as session:
+                return await job(Repository(session))
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._execute(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _execute(self, batch: list[tuple[WriteJob, asyncio.Future]]) -> None:
+        try:
+            async with self.session_factory() as session:
+                repo = Repository(session, autocommit=False)
+                results = [await job(repo) for job, _ in batch]
+                await session.commit()
+        except Exception as e:
+            # One bad job must not fail the others, and every job must see the
+            # repository's usual per-call commit and rollback, so a failed
+            # batch of any size is replayed job by job.
+            if len(batch) > 1:
+                logger.warning("Write batch of %d jobs failed, retrying one by one: %s", len(batch), e)
+            for job, future in batch:
+                await self._execute_one(job, future)
+            return
+        for (_, future), result in zip(batch, results):
+            self._resolve(future, result=result)
+
+    async def _execute_one(self, job: WriteJob, future: asyncio.Future) -> None:
+        try:
+            async with self.session_factory() as session:
+                result = await job(Repository(session))
+        except Exception as e:
+            self._resolve(future, error=e)
+            return
+        self._resolve(future, result=result)
+
+    @staticmethod
+    def _resolve(
+        future: asyncio.Future,
+        result: Any = None,
+        error: Optional[Exception] = None
+    ) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
@@ -1,23 +1,118 @@
 import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.fsm.storage.memory import MemoryStorage
 
-from database.session import init_db
+from database.session import init_db, close_db, AsyncSessionLocal, db_writer
+from service import Container
 from tg_bot import setup_handlers, setup_middleware
-from config import TG_BOT_TOKEN
+from tg_bot.plotting import ChartRenderer
+from tg_bot.chart_cache import ChartCache
+from tg_bot.webhook import run_webhook
+from tg_bot.sharding import run_shard_router
+from tg_bot.storage import SQLStorage
+from observability import setup_logging, cache_collector, day_rollover_collector, start_metrics_server
+from observability.metrics import TelegramRequestMetrics
+from config import (
+    LOG_LEVEL,
+    LOG_SAMPLE_RATES,
+    METRICS_ENABLED,
+    METRICS_HOST,
+    METRICS_PORT,
+    TG_BOT_TOKEN,
+    TELEGRAM_API_URL,
+    BOT_MODE,
+    FSM_STORAGE,
+    FSM_STATE_TTL,
+    CHART_RENDER_WORKERS,
+    CHART_MAX_PENDING,
+    CHART_RENDER_TIMEOUT,
+    CHART_CACHE_SIZE
+)
 
+logger = logging.getLogger(__name__)
 
-bot = Bot(token=TG_BOT_TOKEN)
-dp = Dispatcher()
 
+bot = Bot(
+    token=TG_BOT_TOKEN,
+    session=AiohttpSession(
+        api=TelegramAPIServer.from_base(TELEGRAM_API_URL)
+    ) if TELEGRAM_API_URL else None
+)
+dp = Dispatcher(
+    storage=SQLStorage(
+        AsyncSessionLocal,
+        db_writer=db_writer,
+        ttl=FSM_STATE_TTL
+    ) if FSM_STORAGE == "sql" else MemoryStorage()
+)
+
+if METRICS_ENABLED:
+    bot.session.middleware(TelegramRequestMetrics())
 setup_middleware(dp)
 setup_handlers(dp)
 
 
 async def main():
-    print("Running bot...")
+    log_listener = setup_logging(LOG_LEVEL, LOG_SAMPLE_RATES)
+    metrics_runner = None
+    try:
+        if METRICS_ENABLED:
+            metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+            logger.info("Serving metrics on %s:%s/metrics", METRICS_HOST, METRICS_PORT)
+        await run_bot()
+    finally:
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        log_listener.stop()
+
+
+async def run_bot():
+    if BOT_MODE == "router":
+        logger.info("Running update router...")
+        await run_shard_router(bot, dp.resolve_used_update_types())
+        return
+    logger.info("Running bot...")
+    async with build_dispatcher() as dispatcher:
+        if BOT_MODE == "webhook":
+            await run_webhook(bot, dispatcher)
+        else:
+            await dispatcher.start_polling(bot)
+
+
+@asynccontextmanager
+async def build_dispatcher() -> AsyncIterator[Dispatcher]:
+    # Shared with benchmarks/dispatcher_load.py, so the benchmark drives the
+    # same dependencies the bot runs with.
     await init_db()
-    await dp.start_polling(bot)
+    container = Container()
+    await container.start()
+    chart_renderer = ChartRenderer(
+        max_workers=CHART_RENDER_WORKERS,
+        max_pending=CHART_MAX_PENDING,
+        timeout=CHART_RENDER_TIMEOUT
+    )
+    dp["container"] = container
+    dp["chart_renderer"] = chart_renderer
+    dp["chart_cache"] = ChartCache(max_size=CHART_CACHE_SIZE)
+    cache_collector.register("weather", container.weather_cache)
+    cache_collector.register("identity", container.identity_cache)
+    cache_collector.register("food", container.food_manager.food_cache)
+    cache_collector.register("translation", container.food_manager.translator)
+    cache_collector.register("chart", dp["chart_cache"])
+    if container.day_rollover:
+        day_rollover_collector.register(container.day_rollover)
+    try:
+        yield dp
+    finally:
+        chart_renderer.close()
+        await container.close()
+        await close_db()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,2 @@
+from .log import setup_logging
+from .metrics import cache_collector, day_rollover_collector, start_metrics_server
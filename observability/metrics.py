@@ -0,0 +1,165 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator, Protocol
+
+from aiohttp import web
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+HANDLER_LATENCY = Histogram(
+    "bot_handler_duration_seconds",
+    "Time spent handling an update, by handler",
+    ["event", "handler"]
+)
+HANDLER_ERRORS = Counter(
+    "bot_handler_errors_total",
+    "Updates whose handler raised, by handler",
+    ["event", "handler"]
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing SQL statements, by statement type",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "SQL statements that failed, by statement type",
+    ["operation"]
+)
+API_REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "Time spent in upstream API calls, by provider and operation",
+    ["provider", "operation"]
+)
+API_REQUEST_ERRORS = Counter(
+    "api_request_errors_total",
+    "Upstream API calls that failed, by provider and operation",
+    ["provider", "operation"]
+)
+
+
+class CacheStats(Protocol):
+    hits: int
+    misses: int
+
+
+class CacheCollector:
+
+    def __init__(self) -> None:
+        self._caches: dict[str, CacheStats] = {}
+
+    def register(self, name: str, cache: CacheStats) -> None:
+        self._caches[name] = cache
+
+    def collect(self):
+        # The caches already count hits and misses; they are read at scrape
+        # time instead of being mirrored on every lookup.
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "Share of lookups served from cache", labels=["cache"])
+        for name, cache in self._caches.items():
+            total = cache.hits + cache.misses
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+            ratio.add_metric([name], cache.hits / total if total else 0.0)
+        return [hits, misses, ratio]
+
+
+cache_collector = CacheCollector()
+REGISTRY.register(cache_collector)
+
+
+class DayRolloverStats(Protocol):
+    runs: int
+    failures: int
+    users_processed: int
+    chunks_written: int
+    weather_requests: int
+    offsets_updated: int
+    last_run_seconds: float
+
+
+class DayRolloverCollector:
+
+    COUNTERS = {
+        "runs": "Completed daily goal runs, one per timezone and day",
+        "failures": "Daily goal runs that failed and will be retried",
+        "users_processed": "Users whose next-day rows were prepared",
+        "chunks_written": "Chunks of next-day rows written",
+        "weather_requests": "Weather lookups made while preparing goals",
+        "offsets_updated": "Profiles moved to the UTC offset reported by OWM"
+    }
+
+    def __init__(self) -> None:
+        self._rollover: DayRolloverStats | None = None
+
+    def register(self, rollover: DayRolloverStats) -> None:
+        self._rollover = rollover
+
+    def collect(self):
+        if self._rollover is None:
+            return []
+        metrics = [
+            CounterMetricFamily(f"day_rollover_{name}", documentation, value=getattr(self._rollover, name))
+            for name, documentation in self.COUNTERS.items()
+        ]
+        metrics.append(GaugeMetricFamily(
+            "day_rollover_last_run_seconds",
+            "Duration of the last completed daily goal run",
+            value=self._rollover.last_run_seconds
+        ))
+        return metrics
+
+
+day_rollover_collector = DayRolloverCollector()
+REGISTRY.register(day_rollover_collector)
+
+
+@contextmanager
+def observe_api_call(provider: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        API_REQUEST_ERRORS.labels(provider, operation).inc()
+        raise
+    finally:
+        API_REQUEST_LATENCY.labels(provider, operation).observe(time.perf_counter() - started)
+
+
+async def metrics_middleware(handler, event, data):
+    event_type = "callback_query" if hasattr(event, "message") else "message"
+    handler_name = data["handler"].callback.__name__
+    started = time.perf_counter()
+    try:
+        return await handler(event, data)
+    except Exception:
+        HANDLER_ERRORS.labels(event_type, handler_name).inc()
+        raise
+    finally:
+        HANDLER_LATENCY.labels(event_type, handler_name).observe(time.perf_counter() - started)
+
+
+class TelegramRequestMetrics(BaseRequestMiddleware):
+
+    async def __call__(self, make_request, bot, method):
+        with observe_api_call("telegram", method.__api_method__):
+            return await make_request(bot, method)
+
+
+async def _serve_metrics(request: web.Request) -> web.Response:
+    return web.Response(
+        body=generate_latest(REGISTRY),
+        headers={"Content-Type": CONTENT_TYPE_LATEST}
+    )
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get("/metrics", _serve_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -1 +1,2 @@
 from .service import Service
+from .container import Container
@@ -0,0 +1,109 @@
+from api import HttpClient, UpstreamGuard
+from database.session import AsyncSessionLocal, db_writer
+from api.owm import OWMClient, WeatherCache
+
+from config import (
+    OWM_API_KEY,
+    WEATHER_CACHE_TTL,
+    IDENTITY_CACHE_SIZE,
+    IDENTITY_CACHE_TTL,
+    DAY_ROLLOVER_ENABLED,
+    DAY_ROLLOVER_LEAD_TIME,
+    DAY_ROLLOVER_CHUNK_SIZE,
+    WRITE_BEHIND_ENABLED,
+    WRITE_BEHIND_FLUSH_INTERVAL,
+    WRITE_BEHIND_MAX_PENDING,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    FATSECRET_TIMEOUT,
+    OWM_TIMEOUT,
+    API_CONNECT_TIMEOUT,
+    API_CALL_DEADLINE,
+    API_MAX_RETRIES,
+    API_RETRY_BACKOFF,
+    API_RETRY_BACKOFF_MAX,
+    API_MAX_CONCURRENCY,
+    API_MAX_PENDING,
+    API_CIRCUIT_FAILURE_THRESHOLD,
+    API_CIRCUIT_RECOVERY_TIME
+)
+
+from .food_manager import FoodManager
+from .workout_manager import WorkoutManager
+from .stats_versions import StatsVersions
+from .identity_cache import IdentityCache
+from .write_buffer import WriteBehindBuffer
+from .day_rollover import DayRollover
+
+
+class Container:
+
+    def __init__(self) -> None:
+        self.http_client = HttpClient(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            dns_cache_ttl=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+        )
+        self.db_writer = db_writer
+        self.food_manager = FoodManager(
+            self.http_client,
+            self.db_writer,
+            fatsecret_guard=self.upstream_guard("fatsecret", FATSECRET_TIMEOUT)
+        )
+        self.workout_manager = WorkoutManager()
+        self.owm_client = OWMClient(
+            api_key=OWM_API_KEY,
+            http_client=self.http_client,
+            guard=self.upstream_guard("owm", OWM_TIMEOUT)
+        )
+        self.weather_cache = WeatherCache(self.owm_client, ttl=WEATHER_CACHE_TTL)
+        self.stats_versions = StatsVersions()
+        self.identity_cache = IdentityCache(max_size=IDENTITY_CACHE_SIZE, ttl=IDENTITY_CACHE_TTL)
+        self.write_buffer = WriteBehindBuffer(
+            AsyncSessionLocal,
+            db_writer=self.db_writer,
+            flush_interval=WRITE_BEHIND_FLUSH_INTERVAL,
+            max_pending=WRITE_BEHIND_MAX_PENDING
+        ) if WRITE_BEHIND_ENABLED else None
+        self.day_rollover = DayRollover(
+            AsyncSessionLocal,
+            self.weather_cache,
+            db_writer=self.db_writer,
+            identity_cache=self.identity_cache,
+            lead_time=DAY_ROLLOVER_LEAD_TIME,
+            chunk_size=DAY_ROLLOVER_CHUNK_SIZE
+        ) if DAY_ROLLOVER_ENABLED else None
+
+    @staticmethod
+    def upstream_guard(name: str, total_timeout: float) -> UpstreamGuard:
+        return UpstreamGuard(
+            name,
+            total_timeout=total_timeout,
+            connect_timeout=API_CONNECT_TIMEOUT,
+            deadline=API_CALL_DEADLINE,
+            max_retries=API_MAX_RETRIES,
+            backoff_base=API_RETRY_BACKOFF,
+            backoff_max=API_RETRY_BACKOFF_MAX,
+            max_concurrency=API_MAX_CONCURRENCY,
+            max_pending=API_MAX_PENDING,
+            failure_threshold=API_CIRCUIT_FAILURE_THRESHOLD,
+            recovery_time=API_CIRCUIT_RECOVERY_TIME
+        )
+
+    async def start(self) -> None:
+        await self.http_client.start()
+        if self.write_buffer:
+            await self.write_buffer.start()
+        if self.day_rollover:
+            await self.day_rollover.start()
+
+    async def close(self) -> None:
+        if self.day_rollover:
+            await self.day_rollover.close()
+        if self.write_buffer:
+            await self.write_buffer.close()
+        await self.food_manager.close()
+        await self.http_client.close()
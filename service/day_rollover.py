@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.owm import WeatherCache, WeatherData
+from database.repository import Repository
+from database.writer import DatabaseWriter
+
+from .identity_cache import IdentityCache
+
+logger = logging.getLogger(__name__)
+
+
+def local_today(utc_offset: int) -> date:
+    return (datetime.now(timezone.utc) + timedelta(seconds=utc_offset)).date()
+
+
+def default_water_goal(
+    weight: float,
+    activity: int,
+    weather: Optional[WeatherData]
+) -> int:
+    base = 30 * weight + activity / 30 * 500
+    if weather and weather.main.temp > 25:
+        return base + 500
+    return base
+
+
+class DayRollover:
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        weather_cache: WeatherCache,
+        db_writer: Optional[DatabaseWriter] = None,
+        identity_cache: Optional[IdentityCache] = None,
+        lead_time: float = 7200.0,
+        chunk_size: int = 500,
+        idle_interval: float = 3600.0,
+        retry_interval: float = 300.0
+    ) -> None:
+        self.session_factory = session_factory
+        self.weather_cache = weather_cache
+        self.db_writer = db_writer
+        self.identity_cache = identity_cache
+        self.lead_time = lead_time
+        self.chunk_size = chunk_size
+        self.idle_interval = idle_interval
+        self.retry_interval = retry_interval
+        self.runs = 0
+        self.failures = 0
+        self.users_processed = 0
+        self.chunks_written = 0
+        self.weather_requests = 0
+        self.offsets_updated = 0
+        self.last_run_seconds = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self, utc_offset: int, day: date) -> bool:
+        async with self.session_factory() as session:
+            checkpoint = await Repository(session).get_daily_goals_checkpoint(day, utc_offset)
+        if checkpoint and checkpoint.completed:
+            return True
+        # An interrupted run resumes after the last user it committed.
+        last_user_id = checkpoint.last_user_id if checkpoint else 0
+        started = time.monotonic()
+        weather_by_city: dict[str, Optional[WeatherData]] = {}
+        processed = 0
+        while True:
+            async with self.session_factory() as session:
+                profiles = await Repository(session).get_profiles_by_utc_offset(
+                    utc_offset,
+                    after_user_id=last_user_id,
+                    limit=self.chunk_size
+                )
+            new_cities = list({profile.city for profile in profiles} - weather_by_city.keys())
+            if new_cities:
+                weathers = await asyncio.gather(
+                    *(self.weather_cache.get_weather(city) for city in new_cities)
+                )
+                weather_by_city.update(zip(new_cities, weathers))
+                self.weather_requests += len(new_cities)
+            # Profiles created before offsets were stored, and cities whose
+            # offset changed with DST, are moved to the offset OWM reports;
+            # their rows are prepared by the run for that offset.
+            moved: dict[int, int] = {}
+            rows = []
+            for profile in profiles:
+                weather = weather_by_city[profile.city]
+                if weather and weather.timezone != utc_offset:
+                    moved[profile.user_id] = weather.timezone
+                    continue
+                rows.append({
+                    "user_id": profile.user_id,
+                    "day": day,
+                    "water_goal": default_water_goal(profile.weight, profile.activity, weather),
+                    "calories_goal": profile.calorie_goal
+                })
+            if profiles:
+                last_user_id = profiles[-1].user_id
+            completed = len(profiles) < self.chunk_size
+            saved = await self._write(lambda repo: self._save_chunk(
+                repo, rows, moved, day, utc_offset, last_user_id, completed
+            ))
+            if not saved:
+                self.failures += 1
+                return False
+            if moved:
+                self.offsets_updated += len(moved)
+                if self.identity_cache:
+                    for profile in profiles:
+                        if profile.user_id in moved:
+                            self.identity_cache.invalidate(profile.telegram_id)
+            processed += len(profiles)
+            self.users_processed += len(profiles)
+            self.chunks_written += 1
+            logger.info(
+                "Daily goals chunk prepared",
+                extra={"fields": {"day": day, "utc_offset": utc_offset, "users": processed}}
+            )
+            if completed:
+                break
+        self.runs += 1
+        self.last_run_seconds = time.monotonic() - started
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                delay = await self._run_due()
+            except Exception as e:
+                logger.error("Error precomputing daily goals: %s", e)
+                self.failures += 1
+                delay = self.retry_interval
+            await asyncio.sleep(min(delay, self.idle_interval))
+
+    async def _run_due(self) -> float:
+        async with self.session_factory() as session:
+            utc_offsets = await Repository(session).get_utc_offsets()
+        now = datetime.now(timezone.utc)
+        delay = self.idle_interval
+        for utc_offset in utc_offsets:
+            midnight = self._next_midnight(now, utc_offset)
+            run_at = midnight - timedelta(seconds=self.lead_time)
+            if run_at > now:
+                delay = min(delay, (run_at - now).total_seconds())
+                continue
+            day = (midnight + timedelta(seconds=utc_offset)).date()
+            if not await self.run(utc_offset, day):
+                delay = min(delay, self.retry_interval)
+        return delay
+
+    async def _write(self, job: Callable[[Repository], Awaitable[bool]]) -> bool:
+        if self.db_writer:
+            return await self.db_writer.submit(job)
+        async with self.session_factory() as session:
+            return await job(Repository(session))
+
+    @staticmethod
+    async def _save_chunk(
+        repo: Repository,
+        rows: list[dict],
+        utc_offsets: dict[int, int],
+        day: date,
+        utc_offset: int,
+        last_user_id: int,
+        completed: bool
+    ) -> bool:
+        # Inserts are idempotent, so a crash between the two writes only
+        # repeats the chunk on the next run.
+        if not await repo.update_utc_offsets(utc_offsets):
+            return False
+        if not await repo.insert_daily_stats(rows):
+            return False
+        return await repo.save_daily_goals_checkpoint(
+            day=day,
+            utc_offset=utc_offset,
+            last_user_id=last_user_id,
+            completed=completed,
+            updated_at=datetime.now(timezone.utc)
+        )
+
+    @staticmethod
+    def _next_midnight(now: datetime, utc_offset: int) -> datetime:
+        local_now = now + timedelta(seconds=utc_offset)
+        local_midnight = datetime.combine(
+            local_now.date() + timedelta(days=1),
+            datetime.min.time(),
+            tzinfo=timezone.utc
+        )
+        return local_midnight - timedelta(seconds=utc_offset)
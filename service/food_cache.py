@@ -0,0 +1,54 @@
+from typing import TYPE_CHECKING, Optional
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+
+if TYPE_CHECKING:
+    from .food_manager import FoodLookupResult
+
+
+class FoodCache:
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 30 * 24 * 3600,
+        negative_ttl: float = 900
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = timedelta(seconds=ttl)
+        self.negative_ttl = timedelta(seconds=negative_ttl)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, "FoodLookupResult"] = OrderedDict()
+
+    @staticmethod
+    def normalize_name(food_name: str) -> str:
+        return " ".join(food_name.split()).casefold().replace("ё", "е")
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: str) -> Optional["FoodLookupResult"]:
+        result = self._entries.get(key)
+        if result is None or self.is_expired(result):
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: "FoodLookupResult") -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def is_expired(self, result: "FoodLookupResult") -> bool:
+        updated_at = result.updated_at
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        ttl = self.ttl if result.nutrition is not None else self.negative_ttl
+        return datetime.now(timezone.utc) >= updated_at + ttl
@@ -1,17 +1,33 @@
+import logging
 from typing import Optional
 from dataclasses import dataclass
+from datetime import datetime, timezone
 
 import re
-from googletrans import Translator
 
+from api import HttpClient, UpstreamGuard
 from api.fatsecret import FatSecretClient
+from database.repository import Repository
+from database.writer import DatabaseWriter
 
 from config import (
     FATSECRET_CLIENT_ID,
     FATSECRET_CLIENT_SECRET,
-    FATSECRET_SAVE_PATH
+    FATSECRET_SAVE_PATH,
+    FOOD_CACHE_SIZE,
+    FOOD_CACHE_TTL,
+    FOOD_CACHE_NEGATIVE_TTL,
+    FOOD_TRANSLATIONS_PATH,
+    TRANSLATION_CACHE_SIZE,
+    TRANSLATION_BATCH_WINDOW,
+    TRANSLATION_MAX_BATCH_SIZE
 )
 
+from .food_cache import FoodCache
+from .translation import FoodTranslator
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class NutritionInfo:
@@ -21,15 +37,40 @@ class NutritionInfo:
     protein: float
 
 
+@dataclass
+class FoodLookupResult:
+    translated_name: Optional[str]
+    nutrition: Optional[NutritionInfo]
+    updated_at: datetime
+
+
 class FoodManager:
     
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        http_client: HttpClient,
+        db_writer: Optional[DatabaseWriter] = None,
+        fatsecret_guard: Optional[UpstreamGuard] = None
+    ) -> None:
+        self.db_writer = db_writer
         self.fatsecret_client = FatSecretClient(
             client_id=FATSECRET_CLIENT_ID,
             client_secret=FATSECRET_CLIENT_SECRET,
-            save_path=FATSECRET_SAVE_PATH
+            http_client=http_client,
+            save_path=FATSECRET_SAVE_PATH,
+            guard=fatsecret_guard
+        )
+        self.translator = FoodTranslator(
+            dictionary_path=FOOD_TRANSLATIONS_PATH,
+            cache_size=TRANSLATION_CACHE_SIZE,
+            batch_window=TRANSLATION_BATCH_WINDOW,
+            max_batch_size=TRANSLATION_MAX_BATCH_SIZE
+        )
+        self.food_cache = FoodCache(
+            max_size=FOOD_CACHE_SIZE,
+            ttl=FOOD_CACHE_TTL,
+            negative_ttl=FOOD_CACHE_NEGATIVE_TTL
         )
-        self.translator = Translator()
 
     @staticmethod
     def parse_food_description(description: str) -> Optional[NutritionInfo]:
@@ -49,34 +90,107 @@ class FoodManager:
                 protein=protein
             )
         except Exception as e:
-            print(f"Error parsing food description: {e}")
+            logger.error("Error parsing food description: %s", e)
             return None
 
+    async def close(self) -> None:
+        await self.fatsecret_client.close()
+
     async def get_calories_per_100g(
         self,
-        food_name: str
+        food_name: str,
+        repo: Optional[Repository] = None
     ) -> float | None:
+        lookup = await self.lookup_food(food_name, repo)
+        if lookup and lookup.nutrition:
+            return lookup.nutrition.calories
+        return None
+
+    async def lookup_food(
+        self,
+        food_name: str,
+        repo: Optional[Repository] = None
+    ) -> FoodLookupResult | None:
+        key = FoodCache.normalize_name(food_name)
+        cached = self.food_cache.get(key)
+        if cached is not None:
+            return cached
+        stored = None
+        if repo is not None:
+            stored = await self._load_food_lookup(key, repo)
+            if stored is not None and not self.food_cache.is_expired(stored):
+                self.food_cache.put(key, stored)
+                return stored
+            # Translation and FatSecret can take seconds; the read connection
+            # is returned to the pool rather than held across them.
+            await repo.release_connection()
         translated_name = await self.translate_food_name(food_name)
         if not translated_name:
             return None
         food_data = await self.fatsecret_client.get_food_data(translated_name, max_results=1)
-        if not food_data:
-            return None
-        nutrition_info = self.parse_food_description(food_data[0].food_description)
-        if nutrition_info:
-            return nutrition_info.calories
-        return None
+        if food_data is None:
+            # FatSecret is failing: an expired lookup is better than nothing,
+            # and the failure must not be cached as "not found".
+            return stored
+        nutrition_info = None
+        if food_data:
+            nutrition_info = self.parse_food_description(food_data[0].food_description)
+        lookup = FoodLookupResult(
+            translated_name=translated_name,
+            nutrition=nutrition_info,
+            updated_at=datetime.now(timezone.utc)
+        )
+        self.food_cache.put(key, lookup)
+        if repo is not None:
+            await self._save_food_lookup(key, lookup, repo)
+        return lookup
     
     async def translate_food_name(
         self,
         food_name: str
     ) -> str | None:
-        try:
-            result = await self.translator.translate(
-                food_name,            
-                dest='en'
+        return await self.translator.translate(food_name)
+
+    async def _load_food_lookup(
+        self,
+        key: str,
+        repo: Repository
+    ) -> FoodLookupResult | None:
+        stored = await repo.get_food_lookup(key)
+        if stored is None:
+            return None
+        nutrition_info = None
+        if stored.calories is not None:
+            nutrition_info = NutritionInfo(
+                calories=stored.calories,
+                fat=stored.fat or 0.0,
+                carbs=stored.carbs or 0.0,
+                protein=stored.protein or 0.0
             )
-            return result.text
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return None
\ No newline at end of file
+        return FoodLookupResult(
+            translated_name=stored.translated_name,
+            nutrition=nutrition_info,
+            updated_at=stored.updated_at
+        )
+
+    async def _save_food_lookup(
+        self,
+        key: str,
+        lookup: FoodLookupResult,
+        repo: Repository
+    ) -> None:
+        nutrition_info = lookup.nutrition
+        job = lambda writer: writer.save_food_lookup(
+            food_name=key,
+            translated_name=lookup.translated_name,
+            calories=nutrition_info.calories if nutrition_info else None,
+            fat=nutrition_info.fat if nutrition_info else None,
+            carbs=nutrition_info.carbs if nutrition_info else None,
+            protein=nutrition_info.protein if nutrition_info else None,
+            updated_at=lookup.updated_at
+        )
+        if self.db_writer:
+            await repo.release_connection()
+            await self.db_writer.submit(job)
+        else:
+            await job(repo)
\ No newline at end of file
@@ -0,0 +1,79 @@
+import time
+from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from database.models import HealthProfile
+
+
+@dataclass(frozen=True)
+class CachedProfile:
+    weight: float
+    height: float
+    age: int
+    activity: int
+    city: str
+    calorie_goal: int
+    utc_offset: int = 0
+
+    @classmethod
+    def from_model(cls, profile: HealthProfile) -> "CachedProfile":
+        return cls(
+            weight=profile.weight,
+            height=profile.height,
+            age=profile.age,
+            activity=profile.activity,
+            city=profile.city,
+            calorie_goal=profile.calorie_goal,
+            utc_offset=profile.utc_offset
+        )
+
+
+@dataclass(frozen=True)
+class CachedIdentity:
+    telegram_id: int
+    user_id: int
+    profile: Optional[CachedProfile] = None
+
+
+class IdentityCache:
+
+    def __init__(self, max_size: int = 10000, ttl: float = 600.0) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Entries expire so that profile changes made by another process,
+        # such as a utc_offset moved by DayRollover, are picked up.
+        self._entries: OrderedDict[int, tuple[float, CachedIdentity]] = OrderedDict()
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, telegram_id: int) -> CachedIdentity | None:
+        entry = self._entries.get(telegram_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(telegram_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(telegram_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(
+        self,
+        telegram_id: int,
+        user_id: int,
+        profile: Optional[CachedProfile] = None
+    ) -> CachedIdentity:
+        identity = CachedIdentity(telegram_id=telegram_id, user_id=user_id, profile=profile)
+        self._entries[telegram_id] = (time.monotonic() + self.ttl, identity)
+        self._entries.move_to_end(telegram_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return identity
+
+    def invalidate(self, telegram_id: int) -> None:
+        self._entries.pop(telegram_id, None)
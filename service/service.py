@@ -1,4 +1,6 @@
-from typing import Optional
+import logging
+from typing import Awaitable, Callable, Optional, TypeVar
+from contextlib import nullcontext
 
 from datetime import date, timedelta
 
@@ -14,32 +16,45 @@ from application.dto import (
     CalorieHistoryDTO,
     WaterHistoryDTO
 )
-from api.owm import OWMClient
 
-from config import OWM_API_KEY
+from .container import Container
+from .identity_cache import CachedIdentity, CachedProfile
+from .write_buffer import DailyDelta
+from .day_rollover import default_water_goal, local_today
 
-from .food_manager import FoodManager
-from .workout_manager import WorkoutManager
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 
 class Service:
 
     def __init__(
         self,
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        container: Container
     ) -> None:
         self.db_session = db_session
-        self.food_manager = FoodManager()
-        self.workout_manager = WorkoutManager()
+        self.food_manager = container.food_manager
+        self.workout_manager = container.workout_manager
+        self.weather_cache = container.weather_cache
+        self.stats_versions = container.stats_versions
+        self.identity_cache = container.identity_cache
+        self.write_buffer = container.write_buffer
+        self.db_writer = container.db_writer
 
     async def create_user(
         self,
         telegram_id: int
     ) -> bool:
         repo = Repository(self.db_session)
-        user = await repo.get_user_by_telegram_id(telegram_id)
+        identity = await self._get_identity(telegram_id, repo)
+        if identity:
+            return True
+        user = await self._write(repo, lambda writer: writer.add_user(telegram_id))
         if not user:
-            return await repo.add_user(telegram_id)
+            return False
+        self.identity_cache.put(telegram_id, user.id)
         return True
 
     async def update_health_profile(
@@ -53,7 +68,7 @@ class Service:
         calorie_goal: Optional[int] = None,
     ) -> bool:
         repo = Repository(self.db_session)
-        user = await repo.get_user_by_telegram_id(telegram_id)
+        identity = await self._get_identity(telegram_id, repo)
         if not calorie_goal:
             calorie_goal = self.calculate_default_calorie_goal(
                 weight=weight,
@@ -61,17 +76,32 @@ class Service:
                 age=age,
                 activity=activity
             )
-        if user:
-            print("Updating health profile...")
-            return await repo.update_health_profile(
-                user_id=user.id,
+        if identity:
+            logger.debug("Updating health profile", extra={"fields": {"user_id": identity.user_id}})
+            utc_offset = await self._resolve_utc_offset(identity, city, repo)
+            self.identity_cache.invalidate(telegram_id)
+            success = await self._write(repo, lambda writer: writer.update_health_profile(
+                user_id=identity.user_id,
                 weight=weight,
                 height=height,
                 age=age,
                 activity=activity,
                 city=city,
-                calorie_goal=calorie_goal
-            )
+                calorie_goal=calorie_goal,
+                utc_offset=utc_offset
+            ))
+            if success:
+                profile = CachedProfile(
+                    weight=weight,
+                    height=height,
+                    age=age,
+                    activity=activity,
+                    city=city,
+                    calorie_goal=calorie_goal,
+                    utc_offset=utc_offset
+                )
+                self.identity_cache.put(telegram_id, identity.user_id, profile)
+            return success
         return False
     
     async def get_health_profile(
@@ -79,19 +109,19 @@ class Service:
         telegram_id: int
     ) -> HealthProfileDTO | None:
         repo = Repository(self.db_session)
-        user = await repo.get_user_by_telegram_id(telegram_id)
-        if not user:
+        identity = await self._get_identity(telegram_id, repo)
+        if not identity:
             return None
-        profile_db = await repo.get_health_profile(user.id)
-        if not profile_db:
+        profile = await self._get_profile(identity, repo)
+        if not profile:
             return None
         profile_dto = HealthProfileDTO(
-            weight=profile_db.weight,
-            height=profile_db.height,
-            age=profile_db.age,
-            activity=str(profile_db.activity),
-            city=profile_db.city,
-            calorie_goal=profile_db.calorie_goal
+            weight=profile.weight,
+            height=profile.height,
+            age=profile.age,
+            activity=str(profile.activity),
+            city=profile.city,
+            calorie_goal=profile.calorie_goal
         )
         return profile_dto
     
@@ -100,23 +130,47 @@ class Service:
         telegram_id: int
     ) -> DailyProgressDTO | None:
         repo = Repository(self.db_session)
-        user = await repo.get_user_by_telegram_id(telegram_id)
-        if not user:
-            return None
-        water_stats = await self.get_daily_water_stats(user.id, repo)
-        calories_stats = await self.get_daily_calories_stats(user.id, repo)
-        if not water_stats or not calories_stats:
+        identity = await self._get_identity(telegram_id, repo)
+        if not identity:
             return None
+        current_date = await self._today(identity, repo)
+        if self.write_buffer:
+            # Creating missing rows may call OWM and wait for the writer, so it
+            # is done before the snapshot, which holds back flushes while open.
+            if not await self._ensure_daily_stats(identity, current_date, repo):
+                return None
+            async with self.write_buffer.snapshot():
+                row = await repo.get_daily_progress(telegram_id, current_date)
+                pending = self.write_buffer.pending_for(identity.user_id, current_date)
+            if row is None or row[2] is None or row[3] is None:
+                return None
+            water_stats, calories_stats = row[2], row[3]
+        else:
+            stats = await self._load_daily_stats(telegram_id, current_date, repo)
+            if stats is None:
+                return None
+            _, water_stats, calories_stats = stats
+            pending = DailyDelta()
         progress_dto = DailyProgressDTO(
             day=str(water_stats.day),
-            water_goal=water_stats.water_goal,
-            water_consumed=water_stats.water_consumed,
+            water_goal=water_stats.water_goal + pending.water_goal,
+            water_consumed=water_stats.water_consumed + pending.water_consumed,
             calories_goal=calories_stats.calories_goal,
-            calories_consumed=calories_stats.calories_consumed,
-            calories_burned=calories_stats.calories_burned
+            calories_consumed=calories_stats.calories_consumed + pending.calories_consumed,
+            calories_burned=calories_stats.calories_burned + pending.calories_burned
         )
         return progress_dto
     
+    async def get_today(
+        self,
+        telegram_id: int
+    ) -> date:
+        repo = Repository(self.db_session)
+        identity = await self._get_identity(telegram_id, repo)
+        if not identity:
+            return local_today(0)
+        return await self._today(identity, repo)
+
     def calculate_default_calorie_goal(
         self,
         weight: float,
@@ -139,42 +193,42 @@ class Service:
     
     async def get_daily_water_stats(
         self,
-        user_id: int,
+        identity: CachedIdentity,
         repo: Repository
     ) -> Optional[DailyWaterStats]:
-        current_date = date.today()
-        water_stats = await repo.get_daily_water_stat(user_id, current_date)
+        current_date = await self._today(identity, repo)
+        water_stats = await repo.get_daily_water_stat(identity.user_id, current_date)
         if water_stats is not None:
             return water_stats
-        profile = await repo.get_health_profile(user_id)
+        profile = await self._get_profile(identity, repo)
         if profile is None:
             return None
         water_goal = await self._calculate_default_water_goal(profile.weight, profile.activity, profile.city)
-        water_stats = await repo.update_daily_water_stats(
-            user_id=user_id,
+        water_stats = await self._write(repo, lambda writer: writer.increment_daily_water_stats(
+            user_id=identity.user_id,
             day=current_date,
             water_goal=water_goal
-        )
+        ))
         return water_stats
     
     async def get_daily_calories_stats(
         self,
-        user_id: int,
+        identity: CachedIdentity,
         repo: Repository
     ) -> Optional[DailyCaloriesStats]:
-        current_date = date.today()
-        calories_stats = await repo.get_daily_calories_stat(user_id, current_date)
+        current_date = await self._today(identity, repo)
+        calories_stats = await repo.get_daily_calories_stat(identity.user_id, current_date)
         if calories_stats is not None:
             return calories_stats
-        profile = await repo.get_health_profile(user_id)
+        profile = await self._get_profile(identity, repo)
         if profile is None:
             return None
         calories_goal = profile.calorie_goal
-        calories_stats = await repo.update_daily_calories_stats(
-            user_id=user_id,
+        calories_stats = await self._write(repo, lambda writer: writer.increment_daily_calories_stats(
+            user_id=identity.user_id,
             day=current_date,
             calories_goal=calories_goal
-        )
+        ))
         return calories_stats
     
     async def log_water_consumption(
@@ -183,27 +237,36 @@ class Service:
         amount: int
     ) -> bool:
         repo = Repository(self.db_session)
-        user = await repo.get_user_by_telegram_id(telegram_id)
-        if not user:
+        identity = await self._get_identity(telegram_id, repo)
+        if not identity:
             return False
-        current_date = date.today()
-        water_stats = await self.get_daily_water_stats(user.id, repo)
+        current_date = await self._today(identity, repo)
+        if self.write_buffer:
+            if not await self._ensure_daily_stats(identity, current_date, repo):
+                return False
+            self.write_buffer.add(identity.user_id, current_date, water_consumed=amount)
+            self.stats_versions.bump(telegram_id)
+            return True
+        water_stats = await self.get_daily_water_stats(identity, repo)
         if not water_stats:
             return False
-        new_amount = water_stats.water_consumed + amount
-        await repo.update_daily_water_stats(
-            user_id=user.id,
+        water_stats = await self._write(repo, lambda writer: writer.increment_daily_water_stats(
+            user_id=identity.user_id,
             day=current_date,
             water_goal=water_stats.water_goal,
-            water_consumed=new_amount
-        )
+            water_consumed_delta=amount
+        ))
+        if not water_stats:
+            return False
+        self.stats_versions.bump(telegram_id)
         return True
     
     async def get_food_calories_per_100g(
         self,
         food_name: str
     ) -> float:
-        result = await self.food_manager.get_calories_per_100g(food_name)
+        repo = Repository(self.db_session)
+        result = await self.food_manager.get_calories_per_100g(food_name, repo)
         return result if result is not None else 0.0
     
     async def log_food_consumption(
@@ -213,22 +276,29 @@ class Service:
         amount_in_grams: float
     ) -> tuple[bool, float]:
         repo = Repository(self.db_session)
-        user = await repo.get_user_by_telegram_id(telegram_id)
-        if not user:
+        identity = await self._get_identity(telegram_id, repo)
+        if not identity:
             return False, 0.0
         total_calories = (calories_per_100g * amount_in_grams) / 100
-        current_date = date.today()
-        calories_stats = await self.get_daily_calories_stats(user.id, repo)
+        current_date = await self._today(identity, repo)
+        if self.write_buffer:
+            if not await self._ensure_daily_stats(identity, current_date, repo):
+                return False, 0.0
+            self.write_buffer.add(identity.user_id, current_date, calories_consumed=int(total_calories))
+            self.stats_versions.bump(telegram_id)
+            return True, total_calories
+        calories_stats = await self.get_daily_calories_stats(identity, repo)
         if not calories_stats:
             return False, 0.0
-        new_calories_consumed = calories_stats.calories_consumed + int(total_calories)
-        await repo.update_daily_calories_stats(
-            user_id=user.id,
+        calories_stats = await self._write(repo, lambda writer: writer.increment_daily_calories_stats(
+            user_id=identity.user_id,
             day=current_date,
             calories_goal=calories_stats.calories_goal,
-            calories_consumed=new_calories_consumed,
-            calories_burned=calories_stats.calories_burned
-        )
+            calories_consumed_delta=int(total_calories)
+        ))
+        if not calories_stats:
+            return False, 0.0
+        self.stats_versions.bump(telegram_id)
         return True, total_calories
     
     async def log_workout(
@@ -243,31 +313,40 @@ class Service:
         )
         additonal_water_goal = duration_minutes // 30 * 200
         repo = Repository(self.db_session)
-        user = await repo.get_user_by_telegram_id(telegram_id)
-        if not user:
+        identity = await self._get_identity(telegram_id, repo)
+        if not identity:
             return False, 0.0, 0.0
-        current_date = date.today()
-        water_stats = await self.get_daily_water_stats(user.id, repo)
+        current_date = await self._today(identity, repo)
+        if self.write_buffer:
+            if not await self._ensure_daily_stats(identity, current_date, repo):
+                return False, 0.0, 0.0
+            self.write_buffer.add(
+                identity.user_id,
+                current_date,
+                water_goal=int(additonal_water_goal),
+                calories_burned=int(burned_calories)
+            )
+            self.stats_versions.bump(telegram_id)
+            return True, burned_calories, additonal_water_goal
+        water_stats = await self.get_daily_water_stats(identity, repo)
         if not water_stats:
             return False, 0.0, 0.0
-        new_water_goal = water_stats.water_goal + additonal_water_goal
-        await repo.update_daily_water_stats(
-            user_id=user.id,
-            day=current_date,
-            water_goal=new_water_goal,
-            water_consumed=water_stats.water_consumed
-        )
-        calories_stats = await self.get_daily_calories_stats(user.id, repo)
+        calories_stats = await self.get_daily_calories_stats(identity, repo)
         if not calories_stats:
             return False, 0.0, 0.0
-        new_calories_burned = calories_stats.calories_burned + int(burned_calories)
-        await repo.update_daily_calories_stats(
-            user_id=user.id,
-            day=current_date,
-            calories_goal=calories_stats.calories_goal,
-            calories_consumed=calories_stats.calories_consumed,
-            calories_burned=new_calories_burned
-        )
+        # Both rows exist now, and the water goal and burned calories are
+        # updated in one transaction so a workout is never half recorded.
+        applied = await self._write(repo, lambda writer: writer.apply_daily_deltas([{
+            "user_id": identity.user_id,
+            "day": current_date,
+            "water_consumed": 0,
+            "water_goal": int(additonal_water_goal),
+            "calories_consumed": 0,
+            "calories_burned": int(burned_calories)
+        }]))
+        if not applied:
+            return False, 0.0, 0.0
+        self.stats_versions.bump(telegram_id)
         return True, burned_calories, additonal_water_goal
     
     async def get_weekly_calorie_history(
@@ -275,24 +354,27 @@ class Service:
         telegram_id: int
     ) -> list[CalorieHistoryDTO]:
         repo = Repository(self.db_session)
-        user = await repo.get_user_by_telegram_id(telegram_id)
-        if not user:
+        identity = await self._get_identity(telegram_id, repo)
+        if not identity:
             return []
-        today = date.today()
+        today = await self._today(identity, repo)
         week_ago = today - timedelta(days=7)
-        history_db = await repo.get_calorie_history(
-            user_id=user.id,
-            start_date=week_ago,
-            limit=7
-        )
-        history_dto = [
-            CalorieHistoryDTO(
-                date_info=stat.day,
-                calories_consumed=stat.calories_consumed,
-                calories_burned=stat.calories_burned
+        async with self._stats_snapshot():
+            # Rows for tomorrow may already exist, pre-created by DayRollover.
+            history_db = await repo.get_calorie_history(
+                user_id=identity.user_id,
+                start_date=week_ago,
+                end_date=today,
+                limit=7
             )
-            for stat in history_db
-        ]
+            history_dto = [
+                CalorieHistoryDTO(
+                    date_info=stat.day,
+                    calories_consumed=stat.calories_consumed + self._pending_delta(identity.user_id, stat.day).calories_consumed,
+                    calories_burned=stat.calories_burned + self._pending_delta(identity.user_id, stat.day).calories_burned
+                )
+                for stat in history_db
+            ]
         return history_dto
     
     async def get_weekly_water_history(
@@ -300,23 +382,25 @@ class Service:
         telegram_id: int
     ) -> list[WaterHistoryDTO]:
         repo = Repository(self.db_session)
-        user = await repo.get_user_by_telegram_id(telegram_id)
-        if not user:
+        identity = await self._get_identity(telegram_id, repo)
+        if not identity:
             return []
-        today = date.today()
+        today = await self._today(identity, repo)
         week_ago = today - timedelta(days=7)
-        history_db = await repo.get_water_history(
-            user_id=user.id,
-            start_date=week_ago,
-            limit=7
-        )
-        history_dto = [
-            WaterHistoryDTO(
-                date_info=stat.day,
-                water_consumed=stat.water_consumed
+        async with self._stats_snapshot():
+            history_db = await repo.get_water_history(
+                user_id=identity.user_id,
+                start_date=week_ago,
+                end_date=today,
+                limit=7
             )
-            for stat in history_db
-        ]
+            history_dto = [
+                WaterHistoryDTO(
+                    date_info=stat.day,
+                    water_consumed=stat.water_consumed + self._pending_delta(identity.user_id, stat.day).water_consumed
+                )
+                for stat in history_db
+            ]
         return history_dto
     
     async def _calculate_default_water_goal(
@@ -325,9 +409,126 @@ class Service:
         activity: int,
         city: str
     ) -> int:
-        base = 30 * weight + activity / 30 * 500
-        owm_client = OWMClient(api_key=OWM_API_KEY)
-        weather = await owm_client.get_weather(city)
-        if weather and weather.main.temp > 25:
-            return base + 500
-        return base
\ No newline at end of file
+        weather = await self.weather_cache.get_weather(city)
+        return default_water_goal(weight, activity, weather)
+
+    async def _resolve_utc_offset(
+        self,
+        identity: CachedIdentity,
+        city: str,
+        repo: Repository
+    ) -> int:
+        weather = await self.weather_cache.get_weather(city)
+        if weather:
+            return weather.timezone
+        profile = await self._get_profile(identity, repo)
+        return profile.utc_offset if profile else 0
+
+    async def _today(
+        self,
+        identity: CachedIdentity,
+        repo: Repository
+    ) -> date:
+        profile = await self._get_profile(identity, repo)
+        return local_today(profile.utc_offset if profile else 0)
+
+    async def _get_identity(
+        self,
+        telegram_id: int,
+        repo: Repository
+    ) -> CachedIdentity | None:
+        identity = self.identity_cache.get(telegram_id)
+        if identity is not None:
+            return identity
+        row = await repo.get_user_with_profile(telegram_id)
+        if row is None:
+            return None
+        user_id, profile = row
+        return self.identity_cache.put(
+            telegram_id,
+            user_id,
+            CachedProfile.from_model(profile) if profile else None
+        )
+
+    async def _get_profile(
+        self,
+        identity: CachedIdentity,
+        repo: Repository
+    ) -> CachedProfile | None:
+        if identity.profile is not None:
+            return identity.profile
+        profile = await repo.get_health_profile(identity.user_id)
+        if profile is None:
+            return None
+        cached_profile = CachedProfile.from_model(profile)
+        self.identity_cache.put(identity.telegram_id, identity.user_id, cached_profile)
+        return cached_profile
+
+    async def _load_daily_stats(
+        self,
+        telegram_id: int,
+        current_date: date,
+        repo: Repository
+    ) -> tuple[int, DailyWaterStats, DailyCaloriesStats] | None:
+        row = await repo.get_daily_progress(telegram_id, current_date)
+        if row is None:
+            return None
+        user_id, profile_db, water_stats, calories_stats = row
+        if profile_db is None:
+            return None
+        profile = CachedProfile.from_model(profile_db)
+        self.identity_cache.put(telegram_id, user_id, profile)
+        if water_stats is None or calories_stats is None:
+            if water_stats is not None:
+                water_goal = water_stats.water_goal
+            else:
+                water_goal = await self._calculate_default_water_goal(profile.weight, profile.activity, profile.city)
+            created = await self._write(repo, lambda writer: writer.create_daily_stats(
+                user_id=user_id,
+                day=current_date,
+                water_goal=water_goal,
+                calories_goal=profile.calorie_goal
+            ))
+            if not created:
+                return None
+            water_stats, calories_stats = created
+            self.stats_versions.bump(telegram_id)
+        return user_id, water_stats, calories_stats
+
+    async def _ensure_daily_stats(
+        self,
+        identity: CachedIdentity,
+        current_date: date,
+        repo: Repository
+    ) -> bool:
+        if self.write_buffer.has_daily_stats(identity.user_id, current_date):
+            return True
+        stats = await self._load_daily_stats(identity.telegram_id, current_date, repo)
+        if stats is None:
+            return False
+        self.write_buffer.mark_daily_stats(identity.user_id, current_date)
+        return True
+
+    async def _write(
+        self,
+        repo: Repository,
+        job: Callable[[Repository], Awaitable[T]]
+    ) -> T:
+        if self.db_writer:
+            await repo.release_connection()
+            return await self.db_writer.submit(job)
+        return await job(repo)
+
+    def _stats_snapshot(self):
+        if self.write_buffer:
+            return self.write_buffer.snapshot()
+        return nullcontext()
+
+    def _pending_delta(
+        self,
+        user_id: int,
+        day: date
+    ) -> DailyDelta:
+        if self.write_buffer:
+            return self.write_buffer.pending_for(user_id, day)
+        return DailyDelta()
\ No newline at end of file
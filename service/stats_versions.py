@@ -0,0 +1,10 @@
+class StatsVersions:
+
+    def __init__(self) -> None:
+        self._versions: dict[int, int] = {}
+
+    def get(self, telegram_id: int) -> int:
+        return self._versions.get(telegram_id, 0)
+
+    def bump(self, telegram_id: int) -> None:
+        self._versions[telegram_id] = self._versions.get(telegram_id, 0) + 1
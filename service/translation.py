@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from typing import Optional
+from collections import OrderedDict
+
+import yaml
+from googletrans import Translator
+
+from observability.metrics import observe_api_call
+
+from .food_cache import FoodCache
+
+logger = logging.getLogger(__name__)
+
+
+class FoodTranslator:
+
+    def __init__(
+        self,
+        dictionary_path: Optional[str] = None,
+        cache_size: int = 4096,
+        batch_window: float = 0.05,
+        max_batch_size: int = 32
+    ) -> None:
+        self.translator = Translator()
+        self.dictionary = self._load_dictionary(dictionary_path) if dictionary_path else {}
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def translate(
+        self,
+        food_name: str
+    ) -> str | None:
+        key = FoodCache.normalize_name(food_name)
+        if not key:
+            return None
+        if key in self.dictionary:
+            self.hits += 1
+            return self.dictionary[key]
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        self.misses += 1
+        if self.batch_window <= 0:
+            translated = await self._translate_one(key)
+        else:
+            translated = await asyncio.shield(self._enqueue(key))
+        if translated:
+            self._remember(key, translated)
+        return translated
+
+    def _enqueue(self, key: str) -> asyncio.Future:
+        future = self._pending.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = future
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._schedule_flush)
+        return future
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        task = asyncio.create_task(self._flush(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, batch: dict[str, asyncio.Future]) -> None:
+        keys = list(batch)
+        try:
+            results = await self._translate_many(keys)
+        except Exception as e:
+            logger.error("Translation error: %s", e)
+            results = [None] * len(keys)
+        for key, translated in zip(keys, results):
+            future = batch[key]
+            if not future.done():
+                future.set_result(translated)
+
+    async def _translate_many(self, keys: list[str]) -> list[str | None]:
+        if len(keys) == 1:
+            return [await self._translate_one(keys[0])]
+        # Food names never contain newlines after normalization, so one
+        # newline-joined request translates the whole batch.
+        with observe_api_call("googletrans", "translate_batch"):
+            result = await self.translator.translate("\n".join(keys), dest='en')
+            lines = [line.strip() for line in result.text.split("\n")]
+            if len(lines) == len(keys):
+                return [line or None for line in lines]
+            results = await self.translator.translate(keys, dest='en')
+            return [item.text for item in results]
+
+    async def _translate_one(self, key: str) -> str | None:
+        try:
+            with observe_api_call("googletrans", "translate"):
+                result = await self.translator.translate(key, dest='en')
+            return result.text
+        except Exception as e:
+            logger.error("Translation error: %s", e)
+            return None
+
+    def _remember(self, key: str, translated: str) -> None:
+        self._cache[key] = translated
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _load_dictionary(self, dictionary_path: str) -> dict[str, str]:
+        try:
+            with open(dictionary_path, 'r', encoding='utf-8') as file:
+                entries = yaml.safe_load(file) or {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error("Error loading translation dictionary: %s", e)
+            return {}
+        return {
+            FoodCache.normalize_name(str(source)): str(target)
+            for source, target in entries.items()
+        }
@@ -1,7 +1,10 @@
+import logging
 import yaml
 
 from config import EXERCISES_CONFIG_PATH
 
+logger = logging.getLogger(__name__)
+
 
 class WorkoutManager:
     
@@ -26,6 +29,6 @@ class WorkoutManager:
             with open(config_path, 'r') as file:
                 exercises = yaml.safe_load(file)
         except Exception as e:
-            print(f"Error loading exercises configuration: {e}")
+            logger.error("Error loading exercises configuration: %s", e)
             exercises = {}
         return exercises
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.repository import Repository
+from database.writer import DatabaseWriter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DailyDelta:
+    water_consumed: int = 0
+    water_goal: int = 0
+    calories_consumed: int = 0
+    calories_burned: int = 0
+
+    def merge(self, other: "DailyDelta") -> None:
+        self.water_consumed += other.water_consumed
+        self.water_goal += other.water_goal
+        self.calories_consumed += other.calories_consumed
+        self.calories_burned += other.calories_burned
+
+
+class WriteBehindBuffer:
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        flush_interval: float = 2.0,
+        max_pending: int = 500,
+        db_writer: Optional[DatabaseWriter] = None
+    ) -> None:
+        self.session_factory = session_factory
+        self.db_writer = db_writer
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: dict[tuple[int, date], DailyDelta] = {}
+        self._known_days: dict[int, date] = {}
+        self._flush_lock = asyncio.Lock()
+        self._readers = 0
+        self._no_readers = asyncio.Event()
+        self._no_readers.set()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        # The loop is stopped rather than cancelled: a flush cancelled after
+        # taking its batch would lose those deltas.
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def has_daily_stats(self, user_id: int, day: date) -> bool:
+        return self._known_days.get(user_id) == day
+
+    def mark_daily_stats(self, user_id: int, day: date) -> None:
+        self._known_days[user_id] = day
+
+    def add(
+        self,
+        user_id: int,
+        day: date,
+        water_consumed: int = 0,
+        water_goal: int = 0,
+        calories_consumed: int = 0,
+        calories_burned: int = 0
+    ) -> None:
+        delta = self._pending.setdefault((user_id, day), DailyDelta())
+        delta.merge(DailyDelta(
+            water_consumed=water_consumed,
+            water_goal=water_goal,
+            calories_consumed=calories_consumed,
+            calories_burned=calories_burned
+        ))
+        if len(self._pending) >= self.max_pending and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self.flush())
+            self._flush_task.add_done_callback(self._on_size_flush_done)
+
+    def pending_for(self, user_id: int, day: date) -> DailyDelta:
+        return self._pending.get((user_id, day), DailyDelta())
+
+    @asynccontextmanager
+    async def snapshot(self) -> AsyncIterator[None]:
+        # A flush never commits while a snapshot is open, so a reader sees
+        # each delta either in the database or in the pending map, not both.
+        async with self._flush_lock:
+            self._readers += 1
+            self._no_readers.clear()
+        try:
+            yield
+        finally:
+            self._readers -= 1
+            if self._readers == 0:
+                self._no_readers.set()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            await self._no_readers.wait()
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            deltas = [
+                {
+                    "user_id": user_id,
+                    "day": day,
+                    "water_consumed": delta.water_consumed,
+                    "water_goal": delta.water_goal,
+                    "calories_consumed": delta.calories_consumed,
+                    "calories_burned": delta.calories_burned
+                }
+                for (user_id, day), delta in batch.items()
+            ]
+            try:
+                if self.db_writer:
+                    success = await self.db_writer.submit(
+                        lambda writer: writer.apply_daily_deltas(deltas)
+                    )
+                else:
+                    async with self.session_factory() as session:
+                        success = await Repository(session).apply_daily_deltas(deltas)
+            except Exception as e:
+                logger.error("Error flushing write-behind buffer: %s", e)
+                success = False
+            if not success:
+                for key, delta in batch.items():
+                    self._pending.setdefault(key, DailyDelta()).merge(delta)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    def _on_size_flush_done(self, _: asyncio.Task) -> None:
+        self._flush_task = None
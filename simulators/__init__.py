@@ -0,0 +1,5 @@
+from .behavior import Behavior, parse_latency
+from .fatsecret import FatSecretSimulator
+from .owm import OWMSimulator
+from .off import OFFSimulator
+from .server import build_app, simulator_environment, start_simulators
@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+
+from .behavior import Behavior, parse_latency
+from .fatsecret import FatSecretSimulator
+from .off import OFFSimulator
+from .owm import OWMSimulator
+from .server import simulator_environment, start_simulators
+
+
+def behavior(args: argparse.Namespace, provider: str, seed: int) -> Behavior:
+    return Behavior(
+        latency=getattr(args, f"{provider}_latency") or args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        seed=seed
+    )
+
+
+async def serve(args: argparse.Namespace) -> None:
+    runner = await start_simulators(
+        args.host,
+        args.port,
+        fatsecret=FatSecretSimulator(behavior(args, "fatsecret", args.seed), token_ttl=args.token_ttl),
+        owm=OWMSimulator(behavior(args, "owm", args.seed + 1)),
+        off=OFFSimulator(behavior(args, "off", args.seed + 2))
+    )
+    print(f"Simulators listening on http://{args.host}:{args.port}, point the bot at them with:")
+    for name, value in simulator_environment(f"http://{args.host}:{args.port}").items():
+        print(f"{name}={value}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def latency_spec(value: str) -> str:
+    try:
+        parse_latency(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local FatSecret, OpenWeatherMap and Open Food Facts simulators")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=latency_spec, default="fixed:0", help="fixed:MS, uniform:LOW:HIGH, exponential:MEAN or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--fatsecret-latency", type=latency_spec)
+    parser.add_argument("--owm-latency", type=latency_spec)
+    parser.add_argument("--off-latency", type=latency_spec)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per second per provider before 429, 0 for no limit")
+    parser.add_argument("--token-ttl", type=int, default=86400, help="FatSecret access token lifetime, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
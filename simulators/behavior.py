@@ -0,0 +1,70 @@
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from typing import Callable
+
+OK = "ok"
+ERROR = "error"
+RATE_LIMITED = "rate_limited"
+
+LatencyModel = Callable[[random.Random], float]
+
+
+def parse_latency(spec: str) -> LatencyModel:
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(":")] if params else []
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exponential" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(
+        f"Invalid latency spec {spec!r}, expected fixed:MS, uniform:LOW:HIGH, "
+        "exponential:MEAN or lognormal:MEDIAN:SIGMA"
+    )
+
+
+class Behavior:
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        rate_limit: int = 0,
+        seed: int = 0
+    ) -> None:
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.outcomes: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._window_start = 0.0
+        self._window_requests = 0
+
+    async def simulate(self) -> str:
+        # Both draws are taken for every request, so the sequence of outcomes
+        # depends only on the seed and the request order.
+        delay = self.latency(self._random) / 1000
+        failed = self._random.random() < self.error_rate
+        if self._rate_limited():
+            outcome = RATE_LIMITED
+        else:
+            await asyncio.sleep(delay)
+            outcome = ERROR if failed else OK
+        self.outcomes[outcome] += 1
+        return outcome
+
+    def _rate_limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._window_start = now
+            self._window_requests = 0
+        self._window_requests += 1
+        return self._window_requests > self.rate_limit
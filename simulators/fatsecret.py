@@ -0,0 +1,103 @@
+import base64
+import time
+import zlib
+from typing import Optional
+
+from aiohttp import web
+
+from .behavior import Behavior, ERROR, RATE_LIMITED
+
+
+class FatSecretSimulator:
+
+    def __init__(
+        self,
+        behavior: Optional[Behavior] = None,
+        token_ttl: int = 86400,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None
+    ) -> None:
+        self.behavior = behavior or Behavior()
+        self.token_ttl = token_ttl
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.tokens_issued = 0
+        self._tokens: dict[str, float] = {}
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/connect/token", self.token)
+        app.router.add_get("/rest/foods/search/v1", self.search)
+        return app
+
+    async def token(self, request: web.Request) -> web.Response:
+        outcome = await self.behavior.simulate()
+        if outcome == RATE_LIMITED:
+            return web.json_response({"error": "too_many_requests"}, status=429)
+        if outcome == ERROR:
+            return web.json_response({"error": "server_error"}, status=500)
+        if not self._check_credentials(request.headers.get("Authorization", "")):
+            return web.json_response({"error": "invalid_client"}, status=401)
+        self.tokens_issued += 1
+        access_token = f"simulated-token-{self.tokens_issued}"
+        self._tokens[access_token] = time.monotonic() + self.token_ttl
+        return web.json_response({
+            "access_token": access_token,
+            "token_type": "Bearer",
+            "expires_in": self.token_ttl
+        })
+
+    async def search(self, request: web.Request) -> web.Response:
+        outcome = await self.behavior.simulate()
+        if outcome == RATE_LIMITED:
+            return web.json_response({"error": {"code": 12, "message": "Too many requests"}}, status=429)
+        if outcome == ERROR:
+            return web.json_response({"error": {"code": 1, "message": "Internal error"}}, status=500)
+        if not self._check_token(request.headers.get("Authorization", "")):
+            return web.json_response({"error": {"code": 13, "message": "Invalid token"}}, status=401)
+        name = request.query.get("search_expression", "")
+        max_results = max(1, int(request.query.get("max_results", "1")))
+        foods = [self._food(name, index) for index in range(max_results)]
+        return web.json_response({
+            "foods": {
+                # Like the real API, a single result is an object, not a list.
+                "food": foods[0] if len(foods) == 1 else foods,
+                "max_results": str(max_results),
+                "page_number": "0",
+                "total_results": str(max_results)
+            }
+        })
+
+    def _check_credentials(self, authorization: str) -> bool:
+        scheme, _, value = authorization.partition(" ")
+        if scheme != "Basic":
+            return False
+        if self.client_id is None:
+            return True
+        expected = f"{self.client_id}:{self.client_secret or ''}"
+        return base64.b64decode(value).decode() == expected
+
+    def _check_token(self, authorization: str) -> bool:
+        scheme, _, token = authorization.partition(" ")
+        expires_at = self._tokens.get(token)
+        return scheme == "Bearer" and expires_at is not None and time.monotonic() < expires_at
+
+    @staticmethod
+    def _food(name: str, index: int) -> dict:
+        # Nutrition values are derived from the name, so the same query always
+        # gets the same answer.
+        seed = zlib.crc32(f"{name}:{index}".encode())
+        calories = 50 + seed % 500
+        fat = (seed >> 4) % 300 / 10
+        carbs = (seed >> 8) % 800 / 10
+        protein = (seed >> 12) % 300 / 10
+        return {
+            "food_id": str(seed),
+            "food_name": name,
+            "food_type": "Generic",
+            "food_description": (
+                f"Per 100g - Calories: {calories}kcal | Fat: {fat:.2f}g | "
+                f"Carbs: {carbs:.2f}g | Protein: {protein:.2f}g"
+            ),
+            "food_url": f"https://www.fatsecret.com/calories-nutrition/generic/{seed}"
+        }
@@ -0,0 +1,38 @@
+import zlib
+from typing import Optional
+
+from aiohttp import web
+
+from .behavior import Behavior, ERROR, RATE_LIMITED
+
+
+class OFFSimulator:
+
+    def __init__(self, behavior: Optional[Behavior] = None) -> None:
+        self.behavior = behavior or Behavior()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/cgi/search.pl", self.search)
+        return app
+
+    async def search(self, request: web.Request) -> web.Response:
+        outcome = await self.behavior.simulate()
+        if outcome == RATE_LIMITED:
+            return web.Response(text="Too Many Requests", status=429)
+        if outcome == ERROR:
+            return web.Response(text="Internal Server Error", status=500)
+        terms = request.query.get("search_terms", "").strip()
+        products = []
+        if terms:
+            seed = zlib.crc32(terms.casefold().encode())
+            products.append({
+                "product_name": terms,
+                "nutriments": {"energy-kcal_100g": 50 + seed % 500}
+            })
+        return web.json_response({
+            "count": len(products),
+            "page": 1,
+            "page_size": 24,
+            "products": products
+        })
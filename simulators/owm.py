@@ -0,0 +1,64 @@
+import time
+import zlib
+from typing import Optional
+
+from aiohttp import web
+
+from .behavior import Behavior, ERROR, RATE_LIMITED
+
+
+class OWMSimulator:
+
+    def __init__(self, behavior: Optional[Behavior] = None) -> None:
+        self.behavior = behavior or Behavior()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/weather", self.weather)
+        return app
+
+    async def weather(self, request: web.Request) -> web.Response:
+        outcome = await self.behavior.simulate()
+        if outcome == RATE_LIMITED:
+            return web.json_response({"cod": 429, "message": "Your account is temporary blocked due to exceeding of requests limitation"}, status=429)
+        if outcome == ERROR:
+            return web.json_response({"cod": 500, "message": "Internal error"}, status=500)
+        if not request.query.get("appid"):
+            return web.json_response({"cod": 401, "message": "Invalid API key"}, status=401)
+        city = request.query.get("q", "").strip()
+        if not city:
+            return web.json_response({"cod": "400", "message": "Nothing to geocode"}, status=400)
+        seed = zlib.crc32(city.casefold().encode())
+        temp = self._temperature(seed % 450 / 10 - 10, request.query.get("units", "standard"))
+        now = int(time.time())
+        return web.json_response({
+            "coord": {"lon": seed % 36000 / 100 - 180, "lat": (seed >> 8) % 18000 / 100 - 90},
+            "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}],
+            "base": "stations",
+            "main": {
+                "temp": temp,
+                "feels_like": temp - 1,
+                "temp_min": temp - 2,
+                "temp_max": temp + 2,
+                "pressure": 1000 + seed % 30,
+                "humidity": 30 + seed % 60
+            },
+            "visibility": 10000,
+            "wind": {"speed": seed % 100 / 10, "deg": seed % 360},
+            "clouds": {"all": seed % 100},
+            "dt": now,
+            "sys": {"type": 1, "id": seed % 10000, "country": "RU", "sunrise": now - 21600, "sunset": now + 21600},
+            # Whole-hour offsets between UTC-10 and UTC+12, stable per city.
+            "timezone": (seed % 23 - 10) * 3600,
+            "id": seed,
+            "name": city,
+            "cod": 200
+        })
+
+    @staticmethod
+    def _temperature(celsius: float, units: str) -> float:
+        if units == "metric":
+            return round(celsius, 2)
+        if units == "imperial":
+            return round(celsius * 9 / 5 + 32, 2)
+        return round(celsius + 273.15, 2)
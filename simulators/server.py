@@ -0,0 +1,42 @@
+from typing import Optional
+
+from aiohttp import web
+
+from .fatsecret import FatSecretSimulator
+from .off import OFFSimulator
+from .owm import OWMSimulator
+
+
+def build_app(
+    fatsecret: Optional[FatSecretSimulator] = None,
+    owm: Optional[OWMSimulator] = None,
+    off: Optional[OFFSimulator] = None
+) -> web.Application:
+    app = web.Application()
+    app.add_subapp("/fatsecret", (fatsecret or FatSecretSimulator()).app())
+    app.add_subapp("/owm", (owm or OWMSimulator()).app())
+    app.add_subapp("/off", (off or OFFSimulator()).app())
+    return app
+
+
+def simulator_environment(base_url: str) -> dict[str, str]:
+    base_url = base_url.rstrip("/")
+    return {
+        "FATSECRET_TOKEN_URL": f"{base_url}/fatsecret/connect/token",
+        "FATSECRET_API_URL": f"{base_url}/fatsecret/rest",
+        "OWM_API_URL": f"{base_url}/owm",
+        "OFF_API_URL": f"{base_url}/off"
+    }
+
+
+async def start_simulators(
+    host: str,
+    port: int,
+    fatsecret: Optional[FatSecretSimulator] = None,
+    owm: Optional[OWMSimulator] = None,
+    off: Optional[OFFSimulator] = None
+) -> web.AppRunner:
+    runner = web.AppRunner(build_app(fatsecret, owm, off))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
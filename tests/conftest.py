@@ -0,0 +1,5 @@
+import os
+
+# Importing the service package builds the module-level engine from config,
+# so tests that only need their own engines still need a URL set.
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+
+from database.migrations import MIGRATIONS_PATH, run_migrations
+from database.models import Base
+
+# The schema Base.metadata.create_all() produced before the bot had
+# migrations; such databases are stamped at the baseline revision.
+LEGACY_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL,
+    telegram_id INTEGER NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (telegram_id)
+);
+CREATE TABLE daily_calories_stats (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    calories_goal INTEGER NOT NULL,
+    calories_consumed INTEGER NOT NULL,
+    calories_burned INTEGER NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT unique_user_day UNIQUE (user_id, day),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE daily_water_stats (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    water_goal INTEGER NOT NULL,
+    water_consumed INTEGER NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT unique_user_day UNIQUE (user_id, day),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE health_profiles (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    weight FLOAT NOT NULL,
+    height FLOAT NOT NULL,
+    age INTEGER NOT NULL,
+    activity INTEGER NOT NULL,
+    city VARCHAR NOT NULL,
+    calorie_goal INTEGER NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (user_id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+INSERT INTO users (id, telegram_id) VALUES (1, 1001);
+INSERT INTO health_profiles VALUES (1, 1, 70, 180, 30, 60, 'Moscow', 2500);
+INSERT INTO daily_water_stats VALUES (1, 1, '2026-10-17', 2000, 250);
+INSERT INTO daily_calories_stats VALUES (1, 1, '2026-10-17', 2500, 300, 100);
+"""
+
+
+@pytest.mark.parametrize("schema", ["", LEGACY_SCHEMA], ids=["fresh", "create_all"])
+def test_upgrade_head_matches_models(tmp_path, schema):
+    path = tmp_path / "migrations.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript(schema)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        with engine.begin() as connection:
+            run_migrations(connection)
+        with engine.connect() as connection:
+            context = MigrationContext.configure(connection, opts={"compare_type": True})
+            assert compare_metadata(context, Base.metadata) == []
+            revision = connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+            assert revision == ScriptDirectory(str(MIGRATIONS_PATH)).get_current_head()
+    finally:
+        engine.dispose()
+
+
+def test_upgrade_keeps_create_all_data(tmp_path):
+    path = tmp_path / "migrations.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript(LEGACY_SCHEMA)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        with engine.begin() as connection:
+            run_migrations(connection)
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("SELECT telegram_id FROM users").all() == [(1001,)]
+            assert connection.exec_driver_sql("SELECT utc_offset FROM health_profiles").all() == [(0,)]
+            assert connection.exec_driver_sql(
+                "SELECT water_consumed FROM daily_water_stats WHERE user_id = 1"
+            ).all() == [(250,)]
+    finally:
+        engine.dispose()
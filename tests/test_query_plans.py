@@ -0,0 +1,106 @@
+import asyncio
+import os
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from database.migrations import run_migrations
+from database.repository import Repository
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+TODAY = date(2026, 10, 17)
+
+
+async def seed(session: AsyncSession) -> None:
+    repo = Repository(session)
+    for telegram_id in range(1, 21):
+        user = await repo.add_user(telegram_id)
+        await repo.update_health_profile(user.id, 70, 180, 30, 60, "Moscow", 2500)
+        await repo.insert_daily_stats([
+            {
+                "user_id": user.id,
+                "day": TODAY - timedelta(days=days_ago),
+                "water_goal": 2000,
+                "calories_goal": 2500
+            }
+            for days_ago in range(30)
+        ])
+
+
+async def capture_plans(engine, explain: str) -> dict[str, str]:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    queries = {
+        "water_history": lambda repo: repo.get_water_history(1, TODAY - timedelta(days=7), TODAY, limit=7),
+        "calorie_history": lambda repo: repo.get_calorie_history(1, TODAY - timedelta(days=7), TODAY, limit=7),
+        "user_with_profile": lambda repo: repo.get_user_with_profile(1)
+    }
+    plans = {}
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await seed(session)
+        for name, query in queries.items():
+            statements.clear()
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                await query(Repository(session))
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", capture)
+            (statement, parameters), = statements
+            connection = await session.connection()
+            result = await connection.exec_driver_sql(f"{explain} {statement}", parameters)
+            plans[name] = "\n".join(str(row[-1]) for row in result.all())
+    return plans
+
+
+def test_sqlite_queries_use_covering_indexes(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/plans.db")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(run_migrations)
+            return await capture_plans(engine, "EXPLAIN QUERY PLAN")
+        finally:
+            await engine.dispose()
+
+    plans = asyncio.run(run())
+    assert "USING COVERING INDEX ix_daily_water_stats_history" in plans["water_history"]
+    assert "USING COVERING INDEX ix_daily_calories_stats_history" in plans["calorie_history"]
+    assert "SEARCH users USING COVERING INDEX" in plans["user_with_profile"]
+    assert "TEMP B-TREE" not in plans["water_history"] + plans["calorie_history"]
+
+
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_postgresql_queries_use_index_only_scans():
+    schema = f"plans_{uuid.uuid4().hex[:8]}"
+
+    async def run():
+        admin = create_async_engine(TEST_POSTGRES_URL)
+        engine = create_async_engine(
+            TEST_POSTGRES_URL,
+            connect_args={"server_settings": {"search_path": schema, "enable_seqscan": "off"}}
+        )
+        try:
+            async with admin.begin() as conn:
+                await conn.execute(text(f"CREATE SCHEMA {schema}"))
+            async with engine.begin() as conn:
+                await conn.run_sync(run_migrations)
+            return await capture_plans(engine, "EXPLAIN")
+        finally:
+            await engine.dispose()
+            async with admin.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            await admin.dispose()
+
+    plans = asyncio.run(run())
+    assert "Index Only Scan" in plans["water_history"]
+    assert "ix_daily_water_stats_history" in plans["water_history"]
+    assert "Index Only Scan" in plans["calorie_history"]
+    assert "ix_daily_calories_stats_history" in plans["calorie_history"]
+    assert "Index Only Scan using users_telegram_id_key" in plans["user_with_profile"]
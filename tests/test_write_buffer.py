@@ -0,0 +1,58 @@
+import asyncio
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.migrations import run_migrations
+from database.models import DailyWaterStats
+from database.repository import Repository
+from service.write_buffer import WriteBehindBuffer
+
+DAY = date(2026, 10, 17)
+
+
+def test_close_waits_for_a_running_flush(tmp_path, monkeypatch):
+    flush_started = asyncio.Event()
+    release_flush = asyncio.Event()
+    apply_daily_deltas = Repository.apply_daily_deltas
+
+    async def blocked_apply_daily_deltas(self, deltas):
+        flush_started.set()
+        await release_flush.wait()
+        return await apply_daily_deltas(self, deltas)
+
+    monkeypatch.setattr(Repository, "apply_daily_deltas", blocked_apply_daily_deltas)
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/buffer.db")
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(run_migrations)
+            async with session_factory() as session:
+                repo = Repository(session)
+                user = await repo.add_user(1)
+                await repo.insert_daily_stats([
+                    {"user_id": user.id, "day": DAY, "water_goal": 2000, "calories_goal": 2500}
+                ])
+            buffer = WriteBehindBuffer(session_factory, flush_interval=0.01)
+            await buffer.start()
+            buffer.add(user.id, DAY, water_consumed=250)
+            await asyncio.wait_for(flush_started.wait(), 5)
+            closing = asyncio.create_task(buffer.close())
+            await asyncio.sleep(0.05)
+            assert not closing.done()
+            release_flush.set()
+            await asyncio.wait_for(closing, 5)
+            async with session_factory() as session:
+                result = await session.execute(
+                    select(DailyWaterStats.water_consumed).where(DailyWaterStats.user_id == user.id)
+                )
+                return result.scalar_one(), buffer.pending_for(user.id, DAY)
+        finally:
+            await engine.dispose()
+
+    water_consumed, pending = asyncio.run(run())
+    assert water_consumed == 250
+    assert pending.water_consumed == 0
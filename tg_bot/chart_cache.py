@@ -0,0 +1,64 @@
+from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+
+
+@dataclass
+class CachedChart:
+    version: int
+    day: date
+    image: Optional[bytes]
+    file_id: Optional[str] = None
+
+
+class ChartCache:
+
+    def __init__(self, max_size: int = 256) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[int, str], CachedChart] = OrderedDict()
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(
+        self,
+        telegram_id: int,
+        chart_type: str,
+        version: int,
+        day: date
+    ) -> CachedChart | None:
+        key = (telegram_id, chart_type)
+        chart = self._entries.get(key)
+        if chart is None or chart.version != version or chart.day != day:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return chart
+
+    def put(
+        self,
+        telegram_id: int,
+        chart_type: str,
+        version: int,
+        day: date,
+        image: bytes,
+        file_id: Optional[str] = None
+    ) -> None:
+        key = (telegram_id, chart_type)
+        # Once Telegram has the photo the file_id is enough to resend it,
+        # so the rendered bytes are not kept around.
+        self._entries[key] = CachedChart(
+            version=version,
+            day=day,
+            image=None if file_id else image,
+            file_id=file_id
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
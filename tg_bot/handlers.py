@@ -3,11 +3,13 @@ from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, C
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
 
-from service import Service
+from service import Service, Container
 from tg_bot.states import HealthProfileForm, LogFoodForm
 from . import messages
-from .plotting import plot_calorie_history, plot_water_history
+from .plotting import ChartRenderer, plot_calorie_history, plot_water_history
+from .chart_cache import ChartCache, CachedChart
 
 
 router = Router()
@@ -34,9 +36,30 @@ def get_calorie_goal_keyboard():
     ])
 
 
+async def answer_cached_chart(message: Message, chart: CachedChart, filename: str):
+    if chart.file_id:
+        await message.answer_photo(chart.file_id)
+    else:
+        await message.answer_photo(BufferedInputFile(chart.image, filename=filename))
+
+
+async def answer_chart(
+    message: Message,
+    chart_cache: ChartCache,
+    chart_type: str,
+    version: int,
+    day: date,
+    plot_bytes: bytes,
+    filename: str
+):
+    sent = await message.answer_photo(BufferedInputFile(plot_bytes, filename=filename))
+    file_id = sent.photo[-1].file_id if sent.photo else None
+    chart_cache.put(message.from_user.id, chart_type, version, day, plot_bytes, file_id)
+
+
 @router.message(Command("start"))
-async def cmd_start(message: Message, session: AsyncSession):
-    service = Service(session)
+async def cmd_start(message: Message, session: AsyncSession, container: Container):
+    service = Service(session, container)
     await service.create_user(message.from_user.id)
     await message.answer(messages.WELCOME_MESSAGE)
 
@@ -49,8 +72,8 @@ async def cmd_set_profile(message: Message, state: FSMContext):
 
 
 @router.message(Command("profile"))
-async def cmd_set_profile(message: Message, session: AsyncSession):
-    service = Service(session)
+async def cmd_profile(message: Message, session: AsyncSession, container: Container):
+    service = Service(session, container)
     profile = await service.get_health_profile(message.from_user.id)
     if not profile:
         await message.answer(messages.PROFILE_NOT_FOUND)
@@ -59,8 +82,8 @@ async def cmd_set_profile(message: Message, session: AsyncSession):
 
 
 @router.message(Command("progress"))
-async def cmd_progress(message: Message, session: AsyncSession):
-    service = Service(session)
+async def cmd_progress(message: Message, session: AsyncSession, container: Container):
+    service = Service(session, container)
     progress = await service.get_daily_progress(message.from_user.id)
     if not progress:
         await message.answer(messages.PROGRESS_NOT_FOUND)
@@ -69,8 +92,8 @@ async def cmd_progress(message: Message, session: AsyncSession):
 
 
 @router.message(Command("log_water"))
-async def cmd_log_water(message: Message, session: AsyncSession):
-    service = Service(session)
+async def cmd_log_water(message: Message, session: AsyncSession, container: Container):
+    service = Service(session, container)
     message_text = message.text.strip()
     parts = message_text.split()
     if len(parts) != 2:
@@ -201,7 +224,7 @@ async def back_restart_activity(query: CallbackQuery, state: FSMContext):
 
 
 @router.message(HealthProfileForm.city)
-async def process_city(message: Message, state: FSMContext, session: AsyncSession):
+async def process_city(message: Message, state: FSMContext, session: AsyncSession, container: Container):
     if len(message.text) < 2 or len(message.text) > 50:
         await message.answer(messages.CITY_INVALID)
         return
@@ -209,7 +232,7 @@ async def process_city(message: Message, state: FSMContext, session: AsyncSessio
     await state.update_data(city=message.text)
     await state.set_state(HealthProfileForm.calorie_goal)
 
-    service = Service(session)
+    service = Service(session, container)
     
     default_calories = service.calculate_default_calorie_goal(
         weight=(await state.get_data())['weight'],
@@ -265,8 +288,8 @@ async def process_calorie_goal(message: Message, state: FSMContext):
 
 
 @router.callback_query(HealthProfileForm.calorie_goal)
-async def process_calorie_default(query: CallbackQuery, state: FSMContext, session: AsyncSession):
-    service = Service(session)
+async def process_calorie_default(query: CallbackQuery, state: FSMContext, session: AsyncSession, container: Container):
+    service = Service(session, container)
     data = await state.get_data()
     
     if query.data == "use_default":
@@ -306,8 +329,8 @@ async def process_calorie_default(query: CallbackQuery, state: FSMContext, sessi
 
 
 @router.callback_query(HealthProfileForm.confirmation)
-async def process_confirmation(query: CallbackQuery, state: FSMContext, session: AsyncSession):
-    service = Service(session)
+async def process_confirmation(query: CallbackQuery, state: FSMContext, session: AsyncSession, container: Container):
+    service = Service(session, container)
     data = await state.get_data()
     if query.data == "confirm_yes":
         
@@ -345,9 +368,9 @@ async def process_confirmation(query: CallbackQuery, state: FSMContext, session:
 
 
 @router.message(Command("log_food"))
-async def cmd_log_food(message: Message, state: FSMContext, session: AsyncSession):
+async def cmd_log_food(message: Message, state: FSMContext, session: AsyncSession, container: Container):
     await state.clear()
-    service = Service(session)
+    service = Service(session, container)
     message_text = message.text.strip()
     parts = message_text.split(maxsplit=1)
     if len(parts) != 2:
@@ -366,14 +389,14 @@ async def cmd_log_food(message: Message, state: FSMContext, session: AsyncSessio
 
 
 @router.message(LogFoodForm.amount_in_grams)
-async def process_food_amount(message: Message, state: FSMContext, session: AsyncSession):
+async def process_food_amount(message: Message, state: FSMContext, session: AsyncSession, container: Container):
     try:
         amount_in_grams = int(message.text)
         if amount_in_grams <= 0:
             await message.answer(messages.LOG_FOOD_INVALID)
             return
         data = await state.get_data()
-        service = Service(session)
+        service = Service(session, container)
         success, total_calories = await service.log_food_consumption(
             telegram_id=message.from_user.id,
             amount_in_grams=amount_in_grams,
@@ -397,8 +420,8 @@ async def cancel_log_food(query: CallbackQuery, state: FSMContext):
 
 
 @router.message(Command("log_workout"))
-async def cmd_log_workout(message: Message, session: AsyncSession):
-    service = Service(session)
+async def cmd_log_workout(message: Message, session: AsyncSession, container: Container):
+    service = Service(session, container)
     message_text = message.text.strip()
     parts = message_text.split()
     if len(parts) != 3:
@@ -421,16 +444,27 @@ async def cmd_log_workout(message: Message, session: AsyncSession):
 
 
 @router.message((Command("workouts")))
-async def cmd_workouts(message: Message, session: AsyncSession):
-    service = Service(session)
-    workout_types = service.workout_manager.get_all_exercises()
+async def cmd_workouts(message: Message, container: Container):
+    workout_types = container.workout_manager.get_all_exercises()
     workouts_text = messages.get_available_workouts_text(workout_types)
     await message.answer(workouts_text)
 
 
 @router.message(Command("weekly_water"))
-async def cmd_weekly_water(message: Message, session: AsyncSession):
-    service = Service(session)
+async def cmd_weekly_water(
+    message: Message,
+    session: AsyncSession,
+    container: Container,
+    chart_renderer: ChartRenderer,
+    chart_cache: ChartCache
+):
+    service = Service(session, container)
+    version = container.stats_versions.get(message.from_user.id)
+    today = await service.get_today(message.from_user.id)
+    cached_chart = chart_cache.get(message.from_user.id, "water", version, today)
+    if cached_chart:
+        await answer_cached_chart(message, cached_chart, "water_history.png")
+        return
     profile = await service.get_health_profile(message.from_user.id)
     if not profile:
         await message.answer(messages.PROFILE_NOT_FOUND)
@@ -439,14 +473,28 @@ async def cmd_weekly_water(message: Message, session: AsyncSession):
     if not water_data:
         await message.answer(messages.PROGRESS_NOT_FOUND)
         return
-    plot_bytes = plot_water_history(water_data)
-    photo = BufferedInputFile(plot_bytes, filename="water_history.png")
-    await message.answer_photo(photo)
+    plot_bytes = await chart_renderer.render(plot_water_history, water_data)
+    if plot_bytes is None:
+        await message.answer(messages.CHART_UNAVAILABLE)
+        return
+    await answer_chart(message, chart_cache, "water", version, today, plot_bytes, "water_history.png")
 
 
 @router.message(Command("weekly_calories"))
-async def cmd_weekly_calories(message: Message, session: AsyncSession):
-    service = Service(session)
+async def cmd_weekly_calories(
+    message: Message,
+    session: AsyncSession,
+    container: Container,
+    chart_renderer: ChartRenderer,
+    chart_cache: ChartCache
+):
+    service = Service(session, container)
+    version = container.stats_versions.get(message.from_user.id)
+    today = await service.get_today(message.from_user.id)
+    cached_chart = chart_cache.get(message.from_user.id, "calories", version, today)
+    if cached_chart:
+        await answer_cached_chart(message, cached_chart, "calorie_history.png")
+        return
     profile = await service.get_health_profile(message.from_user.id)
     if not profile:
         await message.answer(messages.PROFILE_NOT_FOUND)
@@ -455,9 +503,11 @@ async def cmd_weekly_calories(message: Message, session: AsyncSession):
     if not calorie_data:
         await message.answer(messages.PROGRESS_NOT_FOUND)
         return
-    plot_bytes = plot_calorie_history(calorie_data)
-    photo = BufferedInputFile(plot_bytes, filename="calorie_history.png")
-    await message.answer_photo(photo)
+    plot_bytes = await chart_renderer.render(plot_calorie_history, calorie_data)
+    if plot_bytes is None:
+        await message.answer(messages.CHART_UNAVAILABLE)
+        return
+    await answer_chart(message, chart_cache, "calories", version, today, plot_bytes, "calorie_history.png")
 
 
 @router.message(Command("help"))
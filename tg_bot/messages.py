@@ -1,5 +1,3 @@
-from datetime import date
-
 from application.dto import (
     HealthProfileDTO,
     DailyProgressDTO
@@ -59,6 +57,8 @@ LOG_WORKOUT_SUCCESS = "Записано {burned_calories} ккал, дополн
 LOG_WORKOUT_FAILURE = "Не удалось записать информацию о тренировке. Попробуйте позже."
 LOG_WORKOUT_INVALID = "Пожалуйста, введите корректное положительное число для продолжительности тренировки в минутах."
 
+CHART_UNAVAILABLE = "Не удалось построить график. Попробуйте чуть позже."
+
 DEFAULT_CALORIE_NOTICE = "(Рассчитанное значение по умолчанию: {default_calories} ккал)"
 USE_DEFAULT_CALORIE_BUTTON = "Использовать значение по умолчанию"
 
@@ -115,7 +115,7 @@ def format_health_profile(profile: HealthProfileDTO) -> str:
 
 def format_daily_progress(progress: DailyProgressDTO) -> str:
     return (
-        f"📅 Ваш ежедневный прогресс за {date.today()}:\n\n"
+        f"📅 Ваш ежедневный прогресс за {progress.day}:\n\n"
         f"💧 Вода: {progress.water_consumed}/{progress.water_goal} мл\n"
         f"🍽️ Калории потреблено: {progress.calories_consumed}/{progress.calories_goal} ккал\n"
         f"🔥 Калории сожжено: {progress.calories_burned} ккал"
@@ -1,12 +1,58 @@
+import asyncio
+import logging
+import time
+
 from aiogram import Dispatcher
 from database.session import AsyncSessionLocal
+from observability.metrics import metrics_middleware
+
+from config import USER_QUEUE_MAX_DEPTH, METRICS_ENABLED
+
+logger = logging.getLogger(__name__)
+
+
+class UserSerializationMiddleware:
+
+    def __init__(self, max_depth: int = 10) -> None:
+        self.max_depth = max_depth
+        self.dropped = 0
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._depths: dict[int, int] = {}
+
+    async def __call__(self, handler, event, data):
+        user = getattr(event, "from_user", None)
+        if user is None:
+            return await handler(event, data)
+        depth = self._depths.get(user.id, 0)
+        if depth >= self.max_depth:
+            self.dropped += 1
+            logger.warning("Dropping update from user %s: %d updates already queued", user.id, depth)
+            return None
+        self._depths[user.id] = depth + 1
+        # asyncio.Lock wakes waiters in FIFO order, so one user's updates run
+        # in arrival order while other users are not blocked.
+        lock = self._locks.setdefault(user.id, asyncio.Lock())
+        try:
+            async with lock:
+                return await handler(event, data)
+        finally:
+            self._depths[user.id] -= 1
+            if self._depths[user.id] == 0:
+                del self._depths[user.id]
+                del self._locks[user.id]
 
 
 def setup_middleware(dp: Dispatcher):
+    serialization_middleware = UserSerializationMiddleware(max_depth=USER_QUEUE_MAX_DEPTH)
+    dp.message.outer_middleware(serialization_middleware)
+    dp.callback_query.outer_middleware(serialization_middleware)
     dp.message.middleware(get_session_middleware)
     dp.message.middleware(log_middleware)
     dp.callback_query.middleware(get_session_middleware)
     dp.callback_query.middleware(log_middleware)
+    if METRICS_ENABLED:
+        dp.message.middleware(metrics_middleware)
+        dp.callback_query.middleware(metrics_middleware)
 
 
 async def get_session_middleware(handler, event, data):
@@ -17,15 +63,25 @@ async def get_session_middleware(handler, event, data):
 
 async def log_middleware(handler, event, data):
     if hasattr(event, 'message'):
-        print(
-            f"CallbackQuery from user {event.from_user.id} "
-            f"({event.from_user.first_name}): {event.data}"
-        )
+        fields = {
+            "event": "callback_query",
+            "user_id": event.from_user.id,
+            "callback_data": event.data
+        }
     else:
-        print(
-            f"Message from user {event.from_user.id} "
-            f"({event.from_user.first_name}): {event.text}"
-        )
-    
-    return await handler(event, data) 
-    
\ No newline at end of file
+        text = event.text or ""
+        fields = {
+            "event": "message",
+            "user_id": event.from_user.id,
+            "command": text.split()[0] if text.startswith("/") else None
+        }
+    started = time.perf_counter()
+    try:
+        result = await handler(event, data)
+    except Exception:
+        fields["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        logger.exception("Update handling failed", extra={"fields": fields})
+        raise
+    fields["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info("Update handled", extra={"fields": fields, "sampled": True})
+    return result
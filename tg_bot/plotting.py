@@ -1,54 +1,109 @@
-from typing import List
+import asyncio
+import logging
+from typing import Callable, List, TypeVar
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 from io import BytesIO
 
 from application.dto import WaterHistoryDTO, CalorieHistoryDTO
 
+logger = logging.getLogger(__name__)
+
+HistoryT = TypeVar("HistoryT")
+
+
+class ChartRenderer:
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        timeout: float = 10.0
+    ) -> None:
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="chart-renderer"
+        )
+        self._pending = 0
+
+    async def render(
+        self,
+        plot_func: Callable[[List[HistoryT]], bytes],
+        history: List[HistoryT]
+    ) -> bytes | None:
+        if self._pending >= self.max_pending:
+            logger.warning("Chart renderer queue is full")
+            return None
+        self._pending += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, plot_func, history)
+        # The slot is held until the worker thread really finishes, so timed
+        # out renders still count against the queue depth.
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Chart rendering timed out after %s s", self.timeout)
+            return None
+        except Exception as e:
+            logger.error("Error rendering chart: %s", e)
+            return None
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, _: asyncio.Future) -> None:
+        self._pending -= 1
+
 
 def plot_water_history(
     water_history: List[WaterHistoryDTO]
 ) -> bytes:
-    plt.figure(figsize=(12, 6))
+    fig = Figure(figsize=(12, 6))
+    ax = fig.add_subplot()
 
     sorted_history = sorted(water_history, key=lambda x: x.date_info)
     dates = [item.date_info for item in sorted_history]
     water_consumed = [item.water_consumed for item in sorted_history]
 
-    bars = plt.bar(dates, water_consumed, label='Потреблено', color='#3498db', alpha=0.8, width=0.6)
+    bars = ax.bar(dates, water_consumed, label='Потреблено', color='#3498db', alpha=0.8, width=0.6)
 
     for bar in bars:
         height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height,
+        ax.text(bar.get_x() + bar.get_width()/2., height,
                 f'{int(height)}',
                 ha='center', va='bottom', fontsize=9)
-    
-    plt.xlabel('Дата', fontsize=12, fontweight='bold')
-    plt.ylabel('Вода (мл)', fontsize=12, fontweight='bold')
-    plt.title('История потребления воды', fontsize=14, fontweight='bold')
-    plt.legend(fontsize=10, loc='upper left')
-    plt.grid(True, alpha=0.3, axis='y')
-
-    ax = plt.gca()
+
+    ax.set_xlabel('Дата', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Вода (мл)', fontsize=12, fontweight='bold')
+    ax.set_title('История потребления воды', fontsize=14, fontweight='bold')
+    ax.legend(fontsize=10, loc='upper left')
+    ax.grid(True, alpha=0.3, axis='y')
+
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m'))
     ax.xaxis.set_major_locator(mdates.DayLocator())
-    plt.xticks(rotation=45, ha='right')
-    
-    plt.tight_layout()
-    
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+
+    fig.tight_layout()
+
     buf = BytesIO()
-    plt.savefig(buf, dpi=100, format='png')
+    fig.savefig(buf, dpi=100, format='png')
     buf.seek(0)
-    plt.close()
-    
+
     return buf.getvalue()
 
 
 def plot_calorie_history(
     calorie_history: List[CalorieHistoryDTO]
 ) -> bytes:
-    plt.figure(figsize=(12, 6))
+    fig = Figure(figsize=(12, 6))
+    ax = fig.add_subplot()
 
     sorted_history = sorted(calorie_history, key=lambda x: x.date_info)
     dates = [item.date_info for item in sorted_history]
@@ -57,38 +112,37 @@ def plot_calorie_history(
 
     x = np.arange(len(dates))
     width = 0.35
-    
-    bars1 = plt.bar(x - width/2, calories_consumed, width, label='Потреблено', color='#e74c3c', alpha=0.8)
-    bars2 = plt.bar(x + width/2, calories_burned, width, label='Сожжено', color='#f39c12', alpha=0.8)
+
+    bars1 = ax.bar(x - width/2, calories_consumed, width, label='Потреблено', color='#e74c3c', alpha=0.8)
+    bars2 = ax.bar(x + width/2, calories_burned, width, label='Сожжено', color='#f39c12', alpha=0.8)
 
     for bar in bars1:
         height = bar.get_height()
         if height > 0:
-            plt.text(bar.get_x() + bar.get_width()/2., height,
+            ax.text(bar.get_x() + bar.get_width()/2., height,
                     f'{int(height)}',
                     ha='center', va='bottom', fontsize=8)
-    
+
     for bar in bars2:
         height = bar.get_height()
         if height > 0:
-            plt.text(bar.get_x() + bar.get_width()/2., height,
+            ax.text(bar.get_x() + bar.get_width()/2., height,
                     f'{int(height)}',
                     ha='center', va='bottom', fontsize=8)
-    
-    plt.xlabel('Дата', fontsize=12, fontweight='bold')
-    plt.ylabel('Калории (ккал)', fontsize=12, fontweight='bold')
-    plt.title('История калорий', fontsize=14, fontweight='bold')
-    plt.legend(fontsize=10, loc='upper left')
-    plt.grid(True, alpha=0.3, axis='y')
+
+    ax.set_xlabel('Дата', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Калории (ккал)', fontsize=12, fontweight='bold')
+    ax.set_title('История калорий', fontsize=14, fontweight='bold')
+    ax.legend(fontsize=10, loc='upper left')
+    ax.grid(True, alpha=0.3, axis='y')
 
     date_labels = [d.strftime('%d.%m') for d in dates]
-    plt.xticks(x, date_labels, rotation=45, ha='right')
-    
-    plt.tight_layout()
-    
+    ax.set_xticks(x, date_labels, rotation=45, ha='right')
+
+    fig.tight_layout()
+
     buf = BytesIO()
-    plt.savefig(buf, dpi=100, format='png')
+    fig.savefig(buf, dpi=100, format='png')
     buf.seek(0)
-    plt.close()
-    
+
     return buf.getvalue()
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import json
+import secrets
+import signal
+from typing import Optional
+
+from aiohttp import ClientError, ClientTimeout, web
+from aiogram import Bot
+
+from api import HttpClient
+from config import (
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_MAX_CONNECTIONS,
+    SHARD_WORKER_URLS,
+    SHARD_FORWARD_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def get_update_user_id(update: dict) -> Optional[int]:
+    for value in update.values():
+        if not isinstance(value, dict):
+            continue
+        user = value.get("from") or value.get("user")
+        if isinstance(user, dict) and "id" in user:
+            return user["id"]
+    return None
+
+
+class ShardRouter:
+
+    def __init__(
+        self,
+        worker_urls: list[str],
+        http_client: HttpClient,
+        secret_token: Optional[str] = None,
+        forward_timeout: float = 25.0
+    ) -> None:
+        self.worker_urls = worker_urls
+        self.http_client = http_client
+        self.secret_token = secret_token
+        self.forward_timeout = ClientTimeout(total=forward_timeout)
+        self._user_locks: dict[int, asyncio.Lock] = {}
+        self._user_waiters: dict[int, int] = {}
+
+    def shard_for(self, update: dict) -> int:
+        user_id = get_update_user_id(update)
+        key = user_id if user_id is not None else update.get("update_id", 0)
+        return key % len(self.worker_urls)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.secret_token and not secrets.compare_digest(
+            request.headers.get(SECRET_HEADER, ""),
+            self.secret_token
+        ):
+            return web.Response(status=401)
+        body = await request.read()
+        try:
+            update = json.loads(body)
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(update, dict):
+            return web.Response(status=400)
+        user_id = get_update_user_id(update)
+        if user_id is None:
+            return await self._forward(update, body)
+        # Updates of one user are forwarded one at a time, in arrival order,
+        # so the worker sees them in the order Telegram sent them.
+        lock = self._user_locks.setdefault(user_id, asyncio.Lock())
+        self._user_waiters[user_id] = self._user_waiters.get(user_id, 0) + 1
+        try:
+            async with lock:
+                return await self._forward(update, body)
+        finally:
+            self._user_waiters[user_id] -= 1
+            if self._user_waiters[user_id] == 0:
+                del self._user_waiters[user_id]
+                del self._user_locks[user_id]
+
+    async def _forward(self, update: dict, body: bytes) -> web.Response:
+        url = self.worker_urls[self.shard_for(update)]
+        headers = {"Content-Type": "application/json"}
+        if self.secret_token:
+            headers[SECRET_HEADER] = self.secret_token
+        try:
+            # A hung worker would otherwise hold the user's lock, and every
+            # later update of that user would queue behind it.
+            async with self.http_client.session.post(
+                url,
+                data=body,
+                headers=headers,
+                timeout=self.forward_timeout
+            ) as response:
+                await response.read()
+                return web.Response(status=response.status)
+        except (ClientError, asyncio.TimeoutError) as e:
+            logger.error("Error forwarding update to %s: %r", url, e)
+            # A non-2xx answer makes Telegram redeliver the update later.
+            return web.Response(status=502)
+
+
+async def run_shard_router(bot: Bot, allowed_updates: list[str]) -> None:
+    if not SHARD_WORKER_URLS:
+        raise RuntimeError("BOT_MODE=router requires SHARD_WORKER_URLS")
+    http_client = HttpClient(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+    )
+    await http_client.start()
+    router = ShardRouter(
+        SHARD_WORKER_URLS,
+        http_client,
+        secret_token=WEBHOOK_SECRET,
+        forward_timeout=SHARD_FORWARD_TIMEOUT
+    )
+    app = web.Application()
+    app.router.add_post(WEBHOOK_PATH, router.handle)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT)
+    await site.start()
+    if WEBHOOK_URL:
+        await bot.set_webhook(
+            url=f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=allowed_updates
+        )
+    logger.info("Routing updates to %d workers from %s:%s%s", len(SHARD_WORKER_URLS), WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        await runner.cleanup()
+        await http_client.close()
+        await bot.session.close()
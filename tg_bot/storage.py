@@ -0,0 +1,85 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.models import FsmRecord
+from database.repository import Repository
+from database.writer import DatabaseWriter
+
+
+class SQLStorage(BaseStorage):
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        db_writer: Optional[DatabaseWriter] = None,
+        ttl: float = 86400.0,
+        prune_interval: float = 3600.0,
+        key_builder: Optional[KeyBuilder] = None
+    ) -> None:
+        self.session_factory = session_factory
+        self.db_writer = db_writer
+        self.ttl = timedelta(seconds=ttl)
+        self.prune_interval = prune_interval
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._last_prune = time.monotonic()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        value = state.state if isinstance(state, State) else state
+        await self._write(lambda repo: repo.set_fsm_state(
+            self.key_builder.build(key),
+            value,
+            datetime.now(timezone.utc)
+        ))
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        record = await self._get_record(key)
+        return record.state if record else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        payload = json.dumps(dict(data), ensure_ascii=False, separators=(",", ":")) if data else None
+        await self._write(lambda repo: repo.set_fsm_data(
+            self.key_builder.build(key),
+            payload,
+            datetime.now(timezone.utc)
+        ))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        record = await self._get_record(key)
+        if record is None or not record.data:
+            return {}
+        return json.loads(record.data)
+
+    async def close(self) -> None:
+        pass
+
+    async def _get_record(self, key: StorageKey) -> FsmRecord | None:
+        async with self.session_factory() as session:
+            record = await Repository(session).get_fsm_record(self.key_builder.build(key))
+        if record is None or self._is_expired(record.updated_at):
+            return None
+        return record
+
+    async def _write(self, job: Callable[[Repository], Awaitable[bool]]) -> None:
+        await self._run(job)
+        # Abandoned flows are cleaned up lazily instead of by a separate task.
+        if time.monotonic() - self._last_prune >= self.prune_interval:
+            self._last_prune = time.monotonic()
+            before = datetime.now(timezone.utc) - self.ttl
+            await self._run(lambda repo: repo.delete_expired_fsm_records(before))
+
+    async def _run(self, job: Callable[[Repository], Awaitable[bool]]) -> bool:
+        if self.db_writer:
+            return await self.db_writer.submit(job)
+        async with self.session_factory() as session:
+            return await job(Repository(session))
+
+    def _is_expired(self, updated_at: datetime) -> bool:
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) >= updated_at + self.ttl
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import signal
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from config import (
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_MAX_CONCURRENT_UPDATES,
+    WEBHOOK_SHUTDOWN_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateLimiter:
+
+    def __init__(self, limit: int) -> None:
+        self._semaphore = asyncio.Semaphore(limit)
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def __call__(self, handler, event, data):
+        self._active += 1
+        self._idle.clear()
+        try:
+            return await handler(event, data)
+        finally:
+            self._active -= 1
+            if self._active == 0:
+                self._idle.set()
+
+    async def limit(self, handler, event, data):
+        async with self._semaphore:
+            return await handler(event, data)
+
+    async def wait_idle(self, timeout: float) -> None:
+        # Let updates accepted just before shutdown reach the middleware.
+        await asyncio.sleep(0)
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Shutting down with %d updates still in progress", self._active)
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher) -> None:
+    limiter = UpdateLimiter(WEBHOOK_MAX_CONCURRENT_UPDATES)
+    dp.update.outer_middleware(limiter)
+    # Slots are taken after UserSerializationMiddleware, so updates waiting
+    # for the same user's previous one do not hold them.
+    dp.message.outer_middleware(limiter.limit)
+    dp.callback_query.outer_middleware(limiter.limit)
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=WEBHOOK_SECRET
+    ).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT)
+    await site.start()
+    if WEBHOOK_URL:
+        await bot.set_webhook(
+            url=f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=dp.resolve_used_update_types()
+        )
+    logger.info("Listening for webhook updates on %s:%s%s", WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        # Stop accepting requests first, then let in-flight updates finish
+        # before the dispatcher and bot session are shut down.
+        await site.stop()
+        await limiter.wait_idle(WEBHOOK_SHUTDOWN_TIMEOUT)
+        await runner.cleanup()